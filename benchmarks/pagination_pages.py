@@ -0,0 +1,34 @@
+"""
+Page.pages() cost from 10 to 10M pages: it only visits the displayed pages,
+so the time per call should stay flat.
+
+    python benchmarks/pagination_pages.py
+"""
+from django.conf import settings
+settings.configure()
+
+from tartarus.django.pagination import Page, Paginator, PAGE_RANGE_DISPLAYED, MARGIN_PAGES_DISPLAYED
+import timeit
+
+PER_PAGE = 10
+NUMBER = 10000
+
+def get_page(num_pages, number):
+    # xrange has a len() without building the list; the rows aren't needed
+    paginator = Paginator(xrange(num_pages * PER_PAGE), PER_PAGE)
+    return Page([], number, paginator)
+
+def main():
+    # The displayed pages never depend on the total
+    max_length = 2 * MARGIN_PAGES_DISPLAYED + PAGE_RANGE_DISPLAYED + 3
+    print '%12s %12s %12s' % ('pages', 'first (us)', 'middle (us)')
+    for exponent in range(1, 8):
+        num_pages = 10 ** exponent
+        for number in (1, num_pages // 2, num_pages):
+            assert len(get_page(num_pages, number).pages()) <= max_length
+        first, middle = get_page(num_pages, 1), get_page(num_pages, num_pages // 2)
+        times = [timeit.timeit(page.pages, number=NUMBER) / NUMBER * 1e6 for page in (first, middle)]
+        print '%12d %12.2f %12.2f' % ((num_pages,) + tuple(times))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Resolving resource urls with the flat patterns (tried one by one by Django)
+and with ResourceDispatchTree, for a growing number of resources. Both must
+return the same matches.
+
+    python benchmarks/url_dispatch.py
+"""
+from django.conf import settings
+settings.configure(PROJECT_NAME='benchmark')
+
+from django.core.urlresolvers import RegexURLResolver, Resolver404
+from django.views.generic import TemplateView, CreateView, UpdateView, DeleteView
+from tartarus.django.resources import Resource
+from tartarus.django.urlresolvers import ResourceDispatchTree
+from tartarus.django.views import DetailView
+import timeit
+
+NUMBER = 2000
+
+def make_resource(i):
+    class List(TemplateView): pass
+    class Detail(DetailView): pass
+    class Create(CreateView): pass
+    class Update(UpdateView): pass
+    class Delete(DeleteView): pass
+    return type('Resource%d' % i, (Resource,), {'name': 'resource%d' % i, 'default': 'list',
+        'List': List, 'Detail': Detail, 'Create': Create, 'Update': Update, 'Delete': Delete})
+
+def get_match(resolver, path):
+    try:
+        match = resolver.resolve(path)
+    except Resolver404:
+        return None
+    return match.func, match.args, match.kwargs, match.url_name
+
+def main():
+    print '%10s %-28s %10s %10s' % ('resources', 'path', 'flat (us)', 'tree (us)')
+    for count in (10, 100, 300, 1000):
+        urls = [make_resource(i)().get_urls() for i in range(count)]
+        flat = RegexURLResolver(r'^/', urls)
+        tree = RegexURLResolver(r'^/', [ResourceDispatchTree(urls)])
+        last = count - 1
+        paths = ['/resource0/', '/resource%d/' % last, '/resource%d/5/' % last,
+            '/resource%d/5/update' % last, '/resource%d/create' % last, '/nothing/']
+        for path in paths:
+            assert get_match(flat, path) == get_match(tree, path), path
+            times = [timeit.timeit(lambda: get_match(resolver, path), number=NUMBER) / NUMBER * 1e6
+                for resolver in (flat, tree)]
+            print '%10d %-28s %10.1f %10.1f' % ((count, path) + tuple(times))
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,84 @@
+from collections import OrderedDict
+import threading
+
+
 def lower_keys(collection):
 	return dict((k.lower(), v) for k,v in collection.iteritems())
+
+
+class LazyList(object):
+	"""List built by calling func the first time it's used"""
+	def __init__(self, func):
+		self._func = func
+		self._list = None
+
+	def _get_list(self):
+		if self._list is None:
+			self._list = list(self._func())
+		return self._list
+
+	def __iter__(self):
+		return iter(self._get_list())
+
+	def __len__(self):
+		return len(self._get_list())
+
+	def __getitem__(self, index):
+		return self._get_list()[index]
+
+	def __nonzero__(self):
+		return bool(self._get_list())
+
+	def __repr__(self):
+		return repr(self._get_list())
+
+
+class LRUCache(object):
+	"""Thread safe dict with at most maxsize items, dropping the least recently used"""
+	def __init__(self, maxsize=128):
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self._items = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key, default=None, validate=None):
+		"""Returns the value of key, or default (a miss) if it's missing or if
+		validate(value) returns false, which drops it"""
+		with self._lock:
+			try:
+				value = self._items.pop(key)
+			except KeyError:
+				self.misses += 1
+				return default
+			if validate is not None and not validate(value):
+				self.misses += 1
+				return default
+			self._items[key] = value
+			self.hits += 1
+			return value
+
+	def set(self, key, value):
+		with self._lock:
+			self._items.pop(key, None)
+			self._items[key] = value
+			while len(self._items) > self.maxsize:
+				self._items.popitem(last=False)
+
+	def delete(self, key):
+		with self._lock:
+			self._items.pop(key, None)
+
+	def clear(self):
+		with self._lock:
+			self._items.clear()
+			self.hits = self.misses = 0
+
+	def stats(self):
+		return {'hits': self.hits, 'misses': self.misses, 'size': len(self._items), 'maxsize': self.maxsize}
+
+	def __len__(self):
+		return len(self._items)
+
+	def __contains__(self, key):
+		return key in self._items
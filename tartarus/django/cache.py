@@ -0,0 +1,107 @@
+"""
+Per-model generation counters, used to invalidate cached data (counts,
+facets, pages...) without having to know every key that was stored.
+
+Every cache key built with a model generation becomes unreachable as soon as
+an instance of that model is saved or deleted.
+
+The counters are stored in the cache, so every process must share it (e.g.
+memcached, not the default local-memory cache): otherwise a process doesn't
+see the saves done by the others. Every model is tracked from the start
+when the tartarus.django.templatetags app is installed (see track_all_models),
+otherwise each model is tracked when it is first used by a view.
+"""
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.query import EmptyQuerySet
+from django.db.models.signals import post_save, post_delete
+from django.db.models.sql.datastructures import EmptyResultSet
+import hashlib
+import time
+import warnings
+
+GENERATION_KEY = 'tartarus:generation:%s'
+# Memcached treats timeouts greater than 30 days as timestamps
+GENERATION_TIMEOUT = 60 * 60 * 24 * 30
+
+_tracked_models = set()
+_track_all = False
+_cache_checked = False
+
+class LocalCacheWarning(RuntimeWarning):
+    pass
+
+def get_model_label(model):
+    return '%s.%s' % (model._meta.app_label, model._meta.object_name.lower())
+
+def check_shared_cache():
+    "Warns (once) if the cache is local to the process."
+    global _cache_checked
+    if _cache_checked:
+        return
+    _cache_checked = True
+    if isinstance(cache, LocMemCache):
+        warnings.warn("The model generations are stored in a local-memory cache: "
+            "the other processes won't invalidate this one's cached data", LocalCacheWarning)
+
+def get_generation(model):
+    check_shared_cache()
+    track_model(model)
+    key = GENERATION_KEY % get_model_label(model)
+    generation = cache.get(key)
+    if generation is None:
+        # Start from the current time, so an evicted counter never goes back
+        # to a generation that was already used
+        generation = int(time.time())
+        if not cache.add(key, generation, GENERATION_TIMEOUT):
+            generation = cache.get(key, generation)
+    return generation
+
+def bump_generation(sender, **kwargs):
+    key = GENERATION_KEY % get_model_label(sender)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time()), GENERATION_TIMEOUT)
+
+def track_all_models():
+    """
+    Connects the signals that bump the generation of any model saved or
+    deleted, when the app is loaded (see tartarus.django.templatetags.models):
+    a process must bump the generations even if it never used the views of
+    the model (e.g. the lazy resources, or a worker).
+    """
+    global _track_all
+    _track_all = True
+    post_save.connect(bump_generation, dispatch_uid='tartarus.generation')
+    post_delete.connect(bump_generation, dispatch_uid='tartarus.generation')
+
+def track_model(model):
+    "Connects the model signals that bump its generation (only once per model)."
+    if _track_all or model in _tracked_models:
+        return
+    _tracked_models.add(model)
+    uid = 'tartarus.generation.%s' % get_model_label(model)
+    post_save.connect(bump_generation, sender=model, dispatch_uid=uid)
+    post_delete.connect(bump_generation, sender=model, dispatch_uid=uid)
+
+def make_key(prefix, *parts):
+    "Builds a short cache key from any number of (unicode-able) parts."
+    digest = hashlib.md5(repr(parts)).hexdigest()
+    return 'tartarus:%s:%s' % (prefix, digest)
+
+def get_query_sql(queryset, ordered=False):
+    """
+    Returns the (sql, params) of the queryset without its ordering (unless
+    ordered), to build cache keys, or None if the queryset can't have rows:
+    an EmptyQuerySet (whose query is still the unfiltered one) or an empty
+    __in filter.
+    """
+    if isinstance(queryset, EmptyQuerySet):
+        return None
+    if not ordered:
+        queryset = queryset.order_by()
+    try:
+        return queryset.query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        return None
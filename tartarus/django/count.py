@@ -0,0 +1,113 @@
+"""
+Count strategies for tartarus.django.pagination.Paginator
+
+Usage:
+
+    class PostPaginator(Paginator):
+        count_strategy = CachedCount(timeout=60)
+
+    class List(ModelResource.List):
+        paginator_class = PostPaginator
+
+A strategy returns a (count, is_exact) tuple. When the count is not exact the
+paginator stops trusting it for the last pages (see Paginator.count_is_exact).
+"""
+from django.core.cache import cache
+from django.db import connections
+from tartarus.django.cache import get_generation, get_query_sql, make_key
+import re
+
+class ExactCount(object):
+    "Plain SELECT COUNT(*), on every call."
+
+    def get_count(self, object_list):
+        return object_list.count(), True
+
+
+class CachedCount(ExactCount):
+    """
+    Exact count stored in the Django cache.
+
+    The key is built from the queryset SQL (without ORDER BY, so every sort
+    choice shares the same count) and its parameters, plus the model
+    generation, so saving or deleting any instance of the model invalidates it.
+    Changes to related models used in the filters are only picked up when the
+    timeout expires.
+
+    Querysets that can't have rows (see get_query_sql) count 0, uncached.
+    """
+    timeout = 300
+
+    def __init__(self, timeout=None):
+        if timeout is not None:
+            self.timeout = timeout
+
+    def get_cache_key(self, object_list):
+        query = get_query_sql(object_list)
+        if query is None:
+            return None
+        sql, params = query
+        return make_key('count', sql, params, object_list.db, get_generation(object_list.model))
+
+    def get_count(self, object_list):
+        key = self.get_cache_key(object_list)
+        if key is None:
+            return 0, True
+        count = cache.get(key)
+        if count is None:
+            count, is_exact = super(CachedCount, self).get_count(object_list)
+            cache.set(key, count, self.timeout)
+        return count, True
+
+
+class EstimatedCount(CachedCount):
+    """
+    Uses the query planner row estimate when it is above the threshold, and
+    an exact (cached) count below it.
+
+    Estimates are available for PostgreSQL and MySQL. SQLite has no row
+    estimate, so it always falls back to the exact count.
+    """
+    threshold = 10000
+
+    def __init__(self, threshold=None, timeout=None):
+        super(EstimatedCount, self).__init__(timeout=timeout)
+        if threshold is not None:
+            self.threshold = threshold
+
+    def get_count(self, object_list):
+        estimate = self.get_estimate(object_list)
+        if estimate is None or estimate < self.threshold:
+            return super(EstimatedCount, self).get_count(object_list)
+        return estimate, False
+
+    def get_estimate(self, object_list):
+        connection = connections[object_list.db]
+        estimate = getattr(self, 'get_%s_estimate' % connection.vendor, None)
+        query = get_query_sql(object_list)
+        if estimate is None or query is None:
+            return None
+        sql, params = query
+        return estimate(connection, sql, params)
+
+    def explain(self, connection, sql, params):
+        cursor = connection.cursor()
+        cursor.execute('EXPLAIN ' + sql, params)
+        return cursor
+
+    def get_postgresql_estimate(self, connection, sql, params):
+        cursor = self.explain(connection, sql, params)
+        match = re.search(r'rows=(\d+)', cursor.fetchone()[0])
+        if match:
+            return int(match.group(1))
+
+    def get_mysql_estimate(self, connection, sql, params):
+        cursor = self.explain(connection, sql, params)
+        columns = [column[0] for column in cursor.description]
+        row = cursor.fetchone()
+        if row and 'rows' in columns:
+            return int(row[columns.index('rows')] or 0)
+
+    def get_sqlite_estimate(self, connection, sql, params):
+        # SQLite's planner doesn't estimate row counts
+        return None
@@ -0,0 +1,118 @@
+"""
+Facet counts for django_easyfilters FilterSets
+
+The simple facets (values, choices and foreign keys) of a FilterSet run one
+GROUP BY query each. FacetEngine computes them all together, in a single
+UNION ALL query where the database allows it, and can cache them per filtered
+queryset (i.e. per normalized filter state).
+
+Usage:
+
+    class List(ModelResource.List):
+        facets_timeout = 60
+        facets_without_counts = ['author']
+        class Filter:
+            fields = ['status', 'author', 'category']
+"""
+from django.core.cache import cache
+from django.db import connections, models
+from django.utils.datastructures import SortedDict
+from django_easyfilters.filters import SimpleQueryMixin
+from django_easyfilters.queries import value_counts
+from tartarus.django.cache import get_generation, get_query_sql, make_key
+import functools
+
+
+class FacetEngine(object):
+    # Backends that accept mixed column types in a UNION ALL
+    batch_vendors = ('sqlite', 'mysql')
+
+    def __init__(self, filterset, timeout=None, without_counts=()):
+        self.filterset = filterset
+        self.timeout = timeout
+        self.without_counts = without_counts
+        self._counts = None
+
+    def install(self):
+        """
+        Makes the simple filters of the FilterSet take their value counts from
+        the engine. Nothing is computed until the first filter asks for them.
+        """
+        for filter in self.get_filters():
+            filter.get_values_counts = functools.partial(self.get_values_counts, filter.field)
+        return self
+
+    def get_filters(self):
+        # Filters with a chosen value only show "remove" links, they don't need counts
+        return [f for f in self.filterset.filters if isinstance(f, SimpleQueryMixin) and not f.chosen]
+
+    def get_values_counts(self, field, queryset):
+        # Every filter gets the same queryset (the filtered one of the FilterSet)
+        if self._counts is None:
+            self._counts = self.get_counts(queryset)
+        return self._counts[field]
+
+    def get_cache_key(self, query, queryset, fields):
+        sql, params = query
+        return make_key('facets', sql, params, queryset.db, fields, self.without_counts,
+                        get_generation(queryset.model))
+
+    def get_counts(self, queryset=None):
+        "Returns a {field: SortedDict({value: count})} dictionary for the filters."
+        if queryset is None:
+            queryset = self.filterset.qs
+        filters = self.get_filters()
+        # A queryset that can't have rows has no values to count
+        query = get_query_sql(queryset)
+        if query is None:
+            return dict((f.field, SortedDict()) for f in filters)
+        if self.timeout is None:
+            return self.compute_counts(queryset, filters)
+        key = self.get_cache_key(query, queryset, [f.field for f in filters])
+        counts = cache.get(key)
+        if counts is None:
+            counts = self.compute_counts(queryset, filters)
+            cache.set(key, counts, self.timeout)
+        return counts
+
+    def compute_counts(self, queryset, filters):
+        counts = {}
+        counted = []
+        for filter in filters:
+            if filter.field in self.without_counts:
+                counts[filter.field] = self.get_values(queryset, filter.field)
+            else:
+                counted.append(filter)
+        if len(counted) > 1 and connections[queryset.db].vendor in self.batch_vendors:
+            counts.update(self.get_batched_counts(queryset, counted))
+        else:
+            for filter in counted:
+                counts[filter.field] = value_counts(queryset, filter.field)
+        return counts
+
+    def get_values(self, queryset, field):
+        "Returns the values of the field, without counting them."
+        values = queryset.values_list(field, flat=True).order_by(field).distinct()
+        return SortedDict((value, None) for value in values)
+
+    def get_batched_counts(self, queryset, filters):
+        selects = []
+        params = []
+        for i, filter in enumerate(filters):
+            counts_queryset = queryset.values_list(filter.field).order_by(filter.field).annotate(models.Count(filter.field))
+            sql, sql_params = counts_queryset.query.get_compiler(queryset.db).as_sql()
+            selects.append('SELECT %d, facet.* FROM (%s) facet' % (i, sql))
+            params.extend(sql_params)
+        cursor = connections[queryset.db].cursor()
+        cursor.execute(' UNION ALL '.join(selects), params)
+        rows = dict((filter.field, []) for filter in filters)
+        for i, value, count in cursor.fetchall():
+            # Column types are lost in the union, convert the values back
+            filter = filters[i]
+            if value is not None:
+                field = getattr(filter, 'rel_field', filter.field_obj)
+                value = field.to_python(value)
+            rows[filter.field].append((value, count))
+        # The order of the subqueries isn't kept by the union (NULL first, like value_counts)
+        return dict((field, SortedDict(sorted(values, key=lambda row: (row[0] is not None, row[0]))))
+                    for field, values in rows.items())
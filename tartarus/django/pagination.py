@@ -5,9 +5,18 @@ Based on https://github.com/jamespacileo/django-pure-pagination
 from django.conf import settings
 
 from math import ceil
+import base64
 import functools
+import json
 
+from django.core import paginator
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db.models import Model, Q
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.fields.related import ManyToManyField
 from django.template.loader import render_to_string
+from tartarus.django.count import ExactCount
+from tartarus.django.querystring import LazyQuerystring, get_querystring
 
 PAGINATION_SETTINGS = getattr(settings, "PAGINATION_SETTINGS", {})
 
@@ -23,14 +32,24 @@ class PageNotAnInteger(InvalidPage):
 class EmptyPage(InvalidPage):
     pass
 
+class InvalidCursor(InvalidPage, paginator.InvalidPage):
+    # Also a django.core.paginator.InvalidPage, so MultipleObjectMixin.paginate_queryset turns it into a 404
+    pass
+
 class Paginator(object):
-    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, request=None):
+    # See tartarus.django.count
+    count_strategy = ExactCount()
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, request=None, count_strategy=None):
         self.object_list = object_list
         self.per_page = per_page
         self.orphans = orphans
         self.allow_empty_first_page = allow_empty_first_page
         self._num_pages = self._count = None
+        self._count_is_exact = True
         self.request = request
+        if count_strategy is not None:
+            self.count_strategy = count_strategy
 
     def validate_number(self, number):
         "Validates the given 1-based page number."
@@ -40,7 +59,7 @@ class Paginator(object):
             raise PageNotAnInteger('That page number is not an integer')
         if number < 1:
             raise EmptyPage('That page number is less than 1')
-        if number > self.num_pages:
+        if number > self.num_pages and self.count_is_exact:
             if number == 1 and self.allow_empty_first_page:
                 pass
             else:
@@ -52,7 +71,7 @@ class Paginator(object):
         number = self.validate_number(number)
         bottom = (number - 1) * self.per_page
         top = bottom + self.per_page
-        if top + self.orphans >= self.count:
+        if top + self.orphans >= self.count and self.count_is_exact:
             top = self.count
         return Page(self.object_list[bottom:top], number, self)
 
@@ -60,7 +79,7 @@ class Paginator(object):
         "Returns the total number of objects, across all pages."
         if self._count is None:
             try:
-                self._count = self.object_list.count()
+                self._count, self._count_is_exact = self.count_strategy.get_count(self.object_list)
             except (AttributeError, TypeError):
                 # AttributeError if object_list has no count() method.
                 # TypeError if object_list.count() requires arguments
@@ -69,6 +88,15 @@ class Paginator(object):
         return self._count
     count = property(_get_count)
 
+    @property
+    def count_is_exact(self):
+        """
+        False when the count strategy returned an estimate: the number of
+        pages is approximate and the last pages can't be trusted.
+        """
+        self._get_count()
+        return self._count_is_exact
+
     def _get_num_pages(self):
         "Returns the total number of pages."
         if self._num_pages is None:
@@ -90,7 +118,7 @@ class Paginator(object):
 
 QuerySetPaginator = Paginator # For backwards-compatibility.
 
-class PageRepresentation(int):
+class PageRepresentation(LazyQuerystring, int):
     def __new__(cls, x, querystring):
         obj = int.__new__(cls, x)
         obj.querystring = querystring
@@ -102,13 +130,13 @@ def add_page_querystring(func):
     def wrapper(self, *args, **kwargs):
         result = func(self, *args, **kwargs)
         if isinstance(result, int):
-            querystring = self._other_page_querystring(result)
+            querystring = functools.partial(self._other_page_querystring, result)
             return PageRepresentation(result, querystring)
         elif isinstance(result, list):
             new_result = []
             for number in result:
                 if isinstance(number, int):
-                    querystring = self._other_page_querystring(number)
+                    querystring = functools.partial(self._other_page_querystring, number)
                     new_result.append(PageRepresentation(number, querystring))
                 else:
                     new_result.append(number)
@@ -121,18 +149,14 @@ class Page(object):
     def __init__(self, object_list, number, paginator):
         self.object_list = object_list
         self.paginator = paginator
-        if paginator.request:
-            # Reason: I just want to perform this operation once, and not once per page
-            self.base_queryset = self.paginator.request.GET.copy()
-            self.base_queryset['page'] = 'page'
-            self.base_queryset = self.base_queryset.urlencode().replace('%', '%%').replace('page=page', 'page=%s')
-
-        self.number = PageRepresentation(number, self._other_page_querystring(number))
+        self.number = PageRepresentation(number, functools.partial(self._other_page_querystring, number))
 
     def __repr__(self):
         return '<Page %s of %s>' % (self.number, self.paginator.num_pages)
 
     def has_next(self):
+        if not self.paginator.count_is_exact:
+            return len(self.object_list) >= self.paginator.per_page
         return self.number < self.paginator.num_pages
 
     def has_previous(self):
@@ -165,6 +189,8 @@ class Page(object):
         relative to total objects found (hits).
         """
         # Special case for the last page because there can be orphans.
+        if not self.paginator.count_is_exact:
+            return self.start_index() + len(self.object_list) - 1
         if self.number == self.paginator.num_pages:
             return self.paginator.count
         return self.number * self.paginator.per_page
@@ -173,28 +199,33 @@ class Page(object):
     def pages(self):
         if self.paginator.num_pages <= PAGE_RANGE_DISPLAYED:
             return range(1, self.paginator.num_pages+1)
-        result = []
+        num_pages = self.paginator.num_pages
         left_side = PAGE_RANGE_DISPLAYED/2
         right_side = PAGE_RANGE_DISPLAYED - left_side
-        if self.number > self.paginator.num_pages - PAGE_RANGE_DISPLAYED/2:
-            right_side = self.paginator.num_pages - self.number
+        if self.number > num_pages - PAGE_RANGE_DISPLAYED/2:
+            right_side = num_pages - self.number
             left_side = PAGE_RANGE_DISPLAYED - right_side
         elif self.number < PAGE_RANGE_DISPLAYED/2:
             left_side = self.number
             right_side = PAGE_RANGE_DISPLAYED - left_side
-        for page in xrange(1, self.paginator.num_pages+1):
-            if page <= MARGIN_PAGES_DISPLAYED:
-                result.append(page)
-                continue
-            if page > self.paginator.num_pages - MARGIN_PAGES_DISPLAYED:
-                result.append(page)
-                continue
-            if (page >= self.number - left_side) and (page <= self.number + right_side):
-                result.append(page)
+        # Only visit the displayed pages (margins and window around the current
+        # page), so the cost doesn't depend on the number of pages
+        ranges = [(1, MARGIN_PAGES_DISPLAYED),
+                  (self.number - left_side, self.number + right_side)]
+        if self.paginator.count_is_exact:
+            ranges.append((num_pages - MARGIN_PAGES_DISPLAYED + 1, num_pages))
+        result = []
+        last = 0
+        for start, end in sorted(ranges):
+            start, end = max(start, last + 1), min(end, num_pages)
+            if start > end:
                 continue
-            if result[-1]:
+            if start > last + 1:
                 result.append(None)
-
+            result.extend(xrange(start, end + 1))
+            last = end
+        if last < num_pages:
+            result.append(None)
         return result
 
     def _other_page_querystring(self, page_number):
@@ -203,7 +234,7 @@ class Page(object):
         GET parameters present.
         """
         if self.paginator.request:
-            return self.base_queryset %page_number
+            return get_querystring(self.paginator.request).replace('page', page_number)
 
         #raise Warning("You must supply Paginator() with the request object for a proper querystring.")
         return 'page=%s' %page_number
@@ -214,3 +245,251 @@ class Page(object):
             'page_obj':self, # Issue 9 https://github.com/jamespacileo/django-pure-pagination/issues/9
                              # Use same naming conventions as Django
             })
+
+
+class CursorRepresentation(str):
+    def __new__(cls, cursor, querystring):
+        obj = str.__new__(cls, cursor)
+        obj.querystring = querystring
+        return obj
+
+
+class CursorPaginator(Paginator):
+    """
+    Keyset (cursor) paginator.
+
+    Instead of slicing with an OFFSET it seeks on the ordering columns of the
+    object list (i.e. the ``order_by`` of the active ``Sort`` choice) plus the
+    primary key as a unique tiebreaker, so every page costs the same no matter
+    how deep it is. The position is carried in an opaque ``cursor`` GET
+    parameter.
+
+    Usage:
+
+        class List(ModelResource.List):
+            paginator_class = CursorPaginator
+
+    The ordering columns must be model fields (or annotations) that can't be
+    NULL: NULL values can't be seeked, and ``extra`` select columns can't be
+    used in a seek condition (ImproperlyConfigured is raised otherwise). A
+    relation is seeked on its key column, so it's ordered by it too (not by
+    the ordering of the related model).
+    """
+    cursor_param = 'cursor'
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, request=None, count_strategy=None, ordering=None):
+        super(CursorPaginator, self).__init__(object_list, per_page, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page, request=request, count_strategy=count_strategy)
+        # The model field and the attribute path of each ordering column
+        self.fields = {}
+        self.attributes = {}
+        self.ordering = self.get_ordering(ordering)
+        if self.has_nullable_ordering():
+            raise ImproperlyConfigured("CursorPaginator can't seek on a nullable column")
+
+    def get_ordering(self, ordering=None):
+        "Returns the ordering as a list of (field, descending) tuples, ending with the primary key."
+        query = self.object_list.query
+        if ordering is None:
+            ordering = query.order_by or self.object_list.model._meta.ordering
+        pk = self.object_list.model._meta.pk
+        result = []
+        for field in ordering:
+            descending = field.startswith('-')
+            field = field.lstrip('-')
+            if field == '?':
+                raise ImproperlyConfigured("CursorPaginator can't paginate a randomly ordered list")
+            if field in query.extra_select:
+                raise ImproperlyConfigured("CursorPaginator can't seek on the extra select column '%s'" % field)
+            if field in ('pk', pk.name, pk.attname):
+                break
+            field, self.fields[field], self.attributes[field] = self.resolve_path(field)
+            result.append((field, descending))
+        else:
+            descending = False
+        self.fields['pk'], self.attributes['pk'] = pk, 'pk'
+        result.append(('pk', descending))
+        return result
+
+    def resolve_path(self, path):
+        """
+        Returns the (path, field, attribute path) of an ordering column. A
+        relation is replaced by its key (e.g. 'tag' by 'tag__id', read from
+        the tag_id attribute). The field is None for annotations.
+        """
+        model = self.object_list.model
+        names = path.split('__')
+        attributes = []
+        previous = field = None
+        for name in names:
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return path, None, path
+            if previous is not None and previous.rel and field == previous.rel.get_related_field():
+                # The key is on the object itself
+                attributes[-1] = previous.attname
+            else:
+                attributes.append(name)
+            if field.rel:
+                model = field.rel.to
+            previous = field
+        if field.rel:
+            related = field.rel.get_related_field()
+            attributes[-1] = field.attname
+            return '%s__%s' % (path, related.name), related, '__'.join(attributes)
+        return path, field, '__'.join(attributes)
+
+    def has_nullable_ordering(self):
+        """
+        True if an ordering column can be NULL (a nullable field, or one
+        reached through a nullable or reverse relation): NULL values can't be
+        seeked, and would be skipped.
+        """
+        for field, descending in self.ordering:
+            if field != 'pk' and self.is_nullable(self.object_list.model, field):
+                return True
+        return False
+
+    def is_nullable(self, model, path):
+        for name in path.split('__'):
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # Reverse relation or annotation (only a COUNT can't be NULL)
+                aggregate = self.object_list.query.aggregates.get(path)
+                return getattr(aggregate, 'sql_function', None) != 'COUNT'
+            if field.null or isinstance(field, ManyToManyField):
+                return True
+            if field.rel:
+                model = field.rel.to
+        return False
+
+    def encode_cursor(self, obj, direction):
+        values = [self.get_value(obj, field) for field, descending in self.ordering]
+        data = json.dumps({'d': direction, 'v': values}, default=self.encode_value, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data).rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(str(cursor) + '=' * (-len(cursor) % 4)))
+            direction, values = data['d'], data['v']
+        except (TypeError, ValueError, KeyError):
+            raise InvalidCursor('That cursor is not valid')
+        if direction not in ('n', 'p') or not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidCursor('That cursor is not valid')
+        return direction, [self.decode_value(field, value) for (field, descending), value in zip(self.ordering, values)]
+
+    def decode_value(self, path, value):
+        "Converts a value of the cursor to the type of its column."
+        if value is None or isinstance(value, (list, dict)):
+            raise InvalidCursor('That cursor is not valid')
+        field = self.fields.get(path)
+        if field is None:
+            return value
+        try:
+            return field.to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            raise InvalidCursor('That cursor is not valid')
+
+    def encode_value(self, value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return unicode(value)
+
+    def get_value(self, obj, field):
+        if isinstance(obj, dict):
+            # values() rows
+            return obj[field]
+        value = obj
+        for attr in self.attributes.get(field, field).split('__'):
+            value = getattr(value, attr)
+        if isinstance(value, Model):
+            value = value.pk
+        return value
+
+    def get_seek_filter(self, values, reverse=False):
+        """
+        Returns the Q object selecting the rows after (or before, if reverse)
+        the given key values:
+
+            (a > va) OR (a = va AND b > vb) OR ...
+        """
+        seek = Q()
+        equal = Q()
+        for (field, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            seek |= equal & Q(**{'%s__%s' % (field, lookup): value})
+            equal &= Q(**{field: value})
+        return seek
+
+    def get_order_by(self, reverse=False):
+        return ['%s%s' % ('-' if descending != reverse else '', field) for field, descending in self.ordering]
+
+    def page(self, number=1):
+        "Returns a CursorPage for the cursor found in the request (the number is ignored)."
+        cursor = self.request and self.request.GET.get(self.cursor_param)
+        direction, values = self.decode_cursor(cursor) if cursor else ('n', None)
+        reverse = direction == 'p'
+        object_list = self.object_list.order_by(*self.get_order_by(reverse))
+        if values is not None:
+            object_list = object_list.filter(self.get_seek_filter(values, reverse))
+        object_list = list(object_list[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if reverse:
+            object_list.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = values is not None, has_more
+        if not object_list and values is None and not self.allow_empty_first_page:
+            raise EmptyPage('That page contains no results')
+        return CursorPage(object_list, self, has_next=has_next, has_previous=has_previous)
+
+    def _cursor_querystring(self, cursor):
+        return get_querystring(self.request).replace(self.cursor_param, cursor, remove=['page'])
+
+
+class CursorPage(object):
+    def __init__(self, object_list, paginator, has_next=False, has_previous=False):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+
+    def __repr__(self):
+        return '<CursorPage of %s objects>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def _cursor(self, obj, direction):
+        cursor = self.paginator.encode_cursor(obj, direction)
+        return CursorRepresentation(cursor, self.paginator._cursor_querystring(cursor))
+
+    def next_cursor(self):
+        if self.has_next():
+            return self._cursor(self.object_list[-1], 'n')
+
+    def previous_cursor(self):
+        if self.has_previous():
+            return self._cursor(self.object_list[0], 'p')
+
+    # Same names as Page, so pagination templates work with both
+    next_page_number = next_cursor
+    previous_page_number = previous_cursor
+
+    def render(self):
+        return render_to_string('_cursor_pagination.html', {
+            'current_page':self,
+            'page_obj':self,
+            })
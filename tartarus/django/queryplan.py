@@ -0,0 +1,125 @@
+"""
+Query plans: the only()/select_related()/prefetch_related() of a queryset,
+derived from the fields a view displays.
+
+The fields are lookup paths, like in filters ('title', 'tag__name'), where
+reverse and many to many relations can also be named by their accessor
+('comment_set'):
+
+    plan = QueryPlan(Post, ['title', 'date', 'tag__name', 'comment_set__text'])
+    plan.apply(Post.objects.all())
+    # Post.objects.only('id', 'title', 'date', 'tag__name').select_related('tag')
+    #     .prefetch_related('comment_set')
+
+Only the fields of the model and of its select_related models are loaded,
+unless some field isn't a model field (e.g. a property), which could use any
+of them.
+"""
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.related import RelatedObject
+
+
+class QueryPlan(object):
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = tuple(fields)
+        self.paths = []
+        only = [model._meta.pk.name]
+        select_related = []
+        prefetch_related = []
+        plan_only = True
+        for field in self.fields:
+            path, kind = self.get_path(model, field.split('__'))
+            self.paths.append('__'.join(path))
+            if kind == 'unknown':
+                plan_only = False
+                continue
+            # The relations on the way: joined up to the first multiple valued one
+            related, prefetched = [], False
+            for i, part in enumerate(path[:-1] if kind == 'field' else path):
+                related.append(part)
+                lookup = '__'.join(related)
+                if prefetched or self.is_multiple(model, path[:i + 1]):
+                    prefetched = True
+                    if lookup not in prefetch_related:
+                        prefetch_related.append(lookup)
+                elif lookup not in select_related:
+                    select_related.append(lookup)
+            if not prefetched and kind == 'field':
+                only.append('__'.join(path))
+            elif not prefetched and kind == 'single':
+                # The related object is loaded whole
+                only.append('__'.join(path))
+        self.paths = tuple(self.paths)
+        self.only = tuple(only) if plan_only else None
+        self.select_related = tuple(self.remove_prefixes(select_related))
+        self.prefetch_related = tuple(self.remove_prefixes(prefetch_related))
+
+    def get_relation(self, model, name):
+        """
+        Returns (field, related model, multiple) for the field or relation of
+        the model with the given name or accessor, or None.
+        """
+        try:
+            field, m, direct, m2m = model._meta.get_field_by_name(name)
+        except FieldDoesNotExist:
+            field = None
+            for related in model._meta.get_all_related_objects() + model._meta.get_all_related_many_to_many_objects():
+                if related.get_accessor_name() == name:
+                    field, direct, m2m = related, False, related.field.rel.multiple
+                    break
+            if field is None:
+                return None
+        if isinstance(field, RelatedObject):
+            multiple = m2m or not field.field.unique
+            return field, field.model, multiple
+        if getattr(field, 'rel', None):
+            return field, field.rel.to, m2m
+        return field, None, False
+
+    def get_path(self, model, parts):
+        """
+        Returns the path with accessor names for the relations, and what it
+        leads to: 'field', 'single' or 'multiple' (a related object or
+        objects) or 'unknown'.
+        """
+        path = []
+        kind = 'unknown'
+        for part in parts:
+            relation = self.get_relation(model, part) if model is not None else None
+            if relation is None:
+                return path + [part], 'unknown'
+            field, model, multiple = relation
+            if isinstance(field, RelatedObject):
+                path.append(field.get_accessor_name())
+            else:
+                path.append(field.name)
+            if model is None:
+                kind = 'field'
+            else:
+                kind = 'multiple' if multiple else 'single'
+        return path, kind
+
+    def is_multiple(self, model, path):
+        for part in path:
+            field, model, multiple = self.get_relation(model, part)
+            if multiple:
+                return True
+        return False
+
+    def remove_prefixes(self, lookups):
+        "select_related('tag__group') also selects 'tag', and so on."
+        return [l for l in lookups if not [o for o in lookups if o.startswith(l + '__')]]
+
+    def apply(self, queryset):
+        if self.only:
+            queryset = queryset.only(*self.only)
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+    def __repr__(self):
+        return '<QueryPlan only=%r select_related=%r prefetch_related=%r>' % (
+            self.only, self.select_related, self.prefetch_related)
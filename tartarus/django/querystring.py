@@ -0,0 +1,74 @@
+"""
+Per-request querystring builder, shared by pagination, sort and filters.
+
+Usage:
+
+    querystring = get_querystring(request)
+    querystring.replace('page', 2)                   # 'sort=title&page=2'
+    querystring.replace('tag', [1, 2], remove=['page'])  # 'sort=title&tag=1&tag=2'
+
+The request parameters are encoded once per set of replaced keys and
+memoized, so building each link only encodes its own parameter.
+"""
+from django.http import QueryDict
+from django.utils.http import urlencode
+
+
+class QueryString(object):
+    def __init__(self, params=None):
+        if params is None:
+            params = QueryDict('')
+        self.params = params
+        self._bases = {}
+
+    def base(self, *keys):
+        "Returns the encoded parameters, without the given keys."
+        if keys not in self._bases:
+            params = self.params.copy()
+            for key in keys:
+                params.pop(key, None)
+            self._bases[keys] = params.urlencode()
+        return self._bases[keys]
+
+    def replace(self, key, value, remove=()):
+        """
+        Returns the querystring with the key set to the value (or values, if
+        it's a list; or removed, if it's None), without the keys in remove.
+        """
+        base = self.base(key, *remove)
+        if value is None:
+            return base
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        param = urlencode([(key, v) for v in value])
+        if base and param:
+            return '%s&%s' % (base, param)
+        return base or param
+
+
+def get_querystring(request):
+    "Returns the QueryString of the request, building it only once per request."
+    if request is None:
+        return QueryString()
+    try:
+        return request._querystring
+    except AttributeError:
+        request._querystring = QueryString(request.GET)
+        return request._querystring
+
+
+class LazyQuerystring(object):
+    """
+    Mixin for link representations (PageRepresentation, ChoiceRepresentation):
+    the querystring can be given as a callable, and it's only built the first
+    time it's accessed (i.e. if the template renders the link).
+    """
+    def _get_querystring(self):
+        if callable(self._querystring):
+            self._querystring = self._querystring()
+        return self._querystring
+
+    def _set_querystring(self, querystring):
+        self._querystring = querystring
+
+    querystring = property(_get_querystring, _set_querystring)
@@ -1,17 +1,27 @@
 # Resources imports
 from django.contrib.admin.sites import site
-from django.views.generic import View as BaseView
+# The detail views are the DetailView subclasses (DeleteView is also a django BaseDetailView)
+from django.views.generic import View as BaseView, DetailView as GenericDetailView
 from django.views.generic.detail import SingleObjectMixin, SingleObjectTemplateResponseMixin
 from django.views.generic.list import MultipleObjectMixin, MultipleObjectTemplateResponseMixin
 from django.conf import settings
 from django.conf.urls.defaults import include, url, patterns
 from django.core.urlresolvers import reverse_lazy
-from tartarus.django.views import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
+from tartarus.django.urlresolvers import ResourceDispatchTree
+from tartarus.django.views import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView, ExportView, JSONListView, JSONDetailView, BulkUpdateView, BulkDeleteView
+from tartarus.django.views.api import JSONResponseMixin, JSONListMixin, JSONDetailMixin
+from tartarus.django.views.bulk import BulkMixin
+from tartarus.django.views.conditional import ConditionalMixin
+from tartarus.django.views.pagecache import PageCacheMixin
+from tartarus.django.cache import track_model
+from tartarus.django.views.export import ListExportMixin
 from tartarus.string import camelcase_split
-from tartarus.utils import config, set_attributes_to_inner_classes, get_leaf_subclasses, underscore_to_label
+from tartarus.metaclass import HierarchyMetaclass
+from tartarus.utils import config, set_attributes_to_inner_classes, underscore_to_label
 from django.utils.encoding import StrAndUnicode
 import operator
 import os
+import re
 
 # Autodiscover imports
 import copy
@@ -19,12 +29,30 @@ from django.conf import settings
 from django.utils.importlib import import_module
 from django.utils.module_loading import module_has_submodule
 import inspect
+import json
+import logging
+import sys
+import threading
+import time
+
+RESOURCES_SETTINGS = getattr(settings, "RESOURCES_SETTINGS", {})
+
+# File where autodiscover saves the resolved resource/url table (None to disable)
+MANIFEST_PATH = RESOURCES_SETTINGS.get("MANIFEST_PATH", None)
+
+# Instantiate the resources on their first request instead of in autodiscover
+LAZY = RESOURCES_SETTINGS.get("LAZY", False)
+
+logger = logging.getLogger('tartarus.resources')
+
+_autodiscovered = {}
+startup_report = []
 
 class ResourceContext(str, StrAndUnicode):
     def __unicode__(self):
         return self.name
 
-class ResourceViewMixin(object):
+class ResourceViewMixin(ConditionalMixin, PageCacheMixin):
     def get_context_data(self, **kwargs):
         context = {'resource':self.resource.get_context_representation(),'view':self.get_context_representation()}
         context.update(kwargs)
@@ -39,11 +67,32 @@ class ResourceViewMixin(object):
         return rc
 
 class Resource(object):
+    __metaclass__ = HierarchyMetaclass
     
     default = 'default'
     
     def __init__(self, *args, **kwargs):
+        self.bind_views()
         self.set_defaults(**kwargs)
+    
+    def bind_views(self):
+        """
+        Gives the resource its own subclass of each of its views: the
+        attributes it sets on them (model, filters, settings...) must not
+        change the views shared with other resources (e.g. the views of
+        ModelResource).
+        """
+        # The subclass of each view of the class (see LazyResource)
+        self.bound_views = {}
+        for name, member in inspect.getmembers(type(self), inspect.isclass):
+            if issubclass(member, BaseView):
+                view = self.bound_views.get(member)
+                if view is None:
+                    view = type(member.__name__, (member,), {'__module__': member.__module__, '__doc__': member.__doc__})
+                    # Only the attributes of the declared view are its own (see set_view_defaults)
+                    view._declared_attributes = set(member.__dict__.get('_declared_attributes', member.__dict__))
+                    self.bound_views[member] = view
+                setattr(self, name, view)
         
     def get_context_representation(self):
         rc = ResourceContext(self.name)
@@ -51,37 +100,61 @@ class Resource(object):
         config(rc, **content)
         return rc
         
-    def set_defaults_views(self):
-        has_slug = hasattr(self, 'slug_field')
+    @classmethod
+    def get_views_defaults(cls, resource=None):
+        """
+        Returns the (view, defaults) pairs of the inner views, where defaults
+        are the attributes set_defaults_views gives them (name, pattern,
+        url_name...). Computed from the attributes of the resource instance,
+        or of the class when no instance is given (see LazyResource).
+        """
+        owner = resource if resource is not None else cls
+        resource_name = owner.name if hasattr(owner, 'name') else cls.get_system_name(cls.__name__)
+        has_slug = hasattr(owner, 'slug_field')
         has_detail = False
-        for name, member in inspect.getmembers(self, inspect.isclass):
-            if issubclass(member, BaseView):
+        views_defaults = []
+        for name, member in inspect.getmembers(owner, inspect.isclass):
+            if issubclass(member, BaseView) and cls.is_view_enabled(owner, member):
+                defaults = {}
+                get = lambda attr: defaults[attr] if attr in defaults else getattr(member, attr)
                 if not hasattr(member, 'name'):
-                    member.name = self.get_system_name(name)
+                    defaults['name'] = cls.get_system_name(name)
                 if not hasattr(member, 'label'):
-                    member.label = underscore_to_label(member.name)
+                    defaults['label'] = underscore_to_label(get('name'))
                 if not hasattr(member, 'pattern'):
+                    # Views of another format, e.g. '.json': list.json, <pk>.json
+                    suffix = getattr(member, 'suffix', None)
                     if issubclass(member, SingleObjectMixin) and not issubclass(member, CreateView):
                         if has_slug:
                             pattern = r'(?P<%s>[-\w]+)/' % member.slug_field
                         else:
                             pattern = r'(?P<pk>\d+)/'
-                        if not has_detail and issubclass(member, DetailView):
+                        if suffix:
+                            pattern = pattern[:-1] + re.escape(suffix)
+                        elif not has_detail and issubclass(member, GenericDetailView):
                             has_detail = True
                         else:
-                            pattern += member.name
+                            pattern += get('name')
+                    elif suffix:
+                        pattern = re.escape(get('name'))
                     else:
-                        pattern = member.name
-                    member.pattern = r'^%s$' % pattern 
+                        pattern = get('name')
+                    defaults['pattern'] = r'^%s$' % pattern 
                 if not hasattr(member, 'url_name'):
-                    member.url_name = '%s#%s' % (self.name, member.name)
+                    defaults['url_name'] = '%s#%s' % (resource_name, get('name'))
                 if not hasattr(member, 'url_names'):
-                    if member.name == self.default:
-                        member.alternative_url_names = [ '%s' % self.name ]
+                    if get('name') == owner.default:
+                        defaults['alternative_url_names'] = [ '%s' % resource_name ]
                     else:
-                        member.alternative_url_names = []
-                if not hasattr(member, 'resource'):
-                    member.resource = self
+                        defaults['alternative_url_names'] = []
+                views_defaults.append((member, defaults))
+        return views_defaults
+    
+    def set_defaults_views(self):
+        for member, defaults in self.get_views_defaults(self):
+            config(member, **defaults)
+            if not hasattr(member, 'resource'):
+                member.resource = self
     
     def set_defaults(self, **kwargs):
         config(self, **kwargs)
@@ -103,51 +176,162 @@ class Resource(object):
         return camelcase_split(whatever, '-')
     
     def get_views(self):
-        views = {member.name: member for name, member in inspect.getmembers(self, inspect.isclass) if issubclass(member, BaseView)}
+        views = {member.name: member for name, member in inspect.getmembers(self, inspect.isclass)
+            if issubclass(member, BaseView) and self.is_view_enabled(self, member)}
         return views
     
+    @staticmethod
+    def is_view_enabled(owner, view):
+        """
+        Optional views (e.g. the exports) name in enabled_by the attribute
+        that enables them: they are only routed if the resource, or the view
+        class itself, sets it.
+        """
+        attr = getattr(view, 'enabled_by', None)
+        if attr is None or getattr(owner, attr, None):
+            return True
+        # Not the attributes the resources give to their views
+        declared = view.__dict__.get('_declared_attributes', view.__dict__)
+        return attr in declared and bool(getattr(view, attr))
+    
     def get_default_view(self):
         views = self.get_views()
         if views.has_key(self.default):
             return views[self.default]
     
-    def get_urls(self):
-        views = self.get_views().values()
-        urls = []
-        for view in views:
-            if view.name == self.default:
+    def get_url_table(self):
+        """
+        Returns the (view, pattern, url_name) entries of the resource urls,
+        sorted for url matching.
+        """
+        views = [(view, {}) for view in self.get_views().values()]
+        return self.build_url_table(views, self.default)
+    
+    @classmethod
+    def get_class_url_table(cls):
+        "Same as get_url_table, without instantiating the resource."
+        views = {defaults.get('name', getattr(view, 'name', None)): (view, defaults) for view, defaults in cls.get_views_defaults()}
+        return cls.build_url_table(views.values(), cls.default)
+    
+    @classmethod
+    def get_class_pattern(cls):
+        if hasattr(cls, 'pattern'):
+            return cls.pattern.strip()
+        return '^%s/' % getattr(cls, 'name', cls.get_system_name(cls.__name__))
+    
+    @staticmethod
+    def build_url_table(views, default):
+        table = []
+        for view, defaults in views:
+            get = lambda attr, *args: defaults[attr] if attr in defaults else getattr(view, attr, *args)
+            if get('name') == default:
                 pattern = '^$'
             else:
-                pattern = getattr(view, 'pattern', view.name)
+                pattern = get('pattern', get('name'))
                 
-            view_instance = view.as_view()
-            url_names = [ view.url_name ]
-            url_names += view.alternative_url_names
+            url_names = [ get('url_name') ]
+            url_names += get('alternative_url_names')
             for url_name in url_names:
-                urls.append(
-                    url(
-                        pattern,
-                        view_instance,
-                        name=url_name
-                    )
-                )
+                table.append((view, pattern, url_name))
         
         #Sort it for url matching
-        urls_sort_dict = {}
-        for i, u in enumerate(urls):
-            level = u.regex.pattern.count('/')
-            urls_sort_dict[i] = level
-        sorted_urls = []
-        for k, i in sorted(urls_sort_dict.iteritems(), key=operator.itemgetter(1)):
-            sorted_urls.insert(i, urls[k])
-        sorted_urls.reverse()
+        table_sort_dict = {}
+        for i, entry in enumerate(table):
+            level = entry[1].count('/')
+            table_sort_dict[i] = level
+        sorted_table = []
+        for k, i in sorted(table_sort_dict.iteritems(), key=operator.itemgetter(1)):
+            sorted_table.insert(i, table[k])
+        sorted_table.reverse()
+        return sorted_table
+    
+    def get_urls(self, table=None):
+        if table is None:
+            table = self.get_url_table()
+        view_instances = {}
+        urls = []
+        for view, pattern, url_name in table:
+            if view not in view_instances:
+                view_instances[view] = view.as_view()
+            urls.append(
+                url(
+                    pattern,
+                    view_instances[view],
+                    name=url_name
+                )
+            )
         pattern = getattr(self, 'pattern', self.name).strip()
-        return url(pattern, include(sorted_urls))
+        return url(pattern, include(urls))
+
+class LazyResource(object):
+    """
+    The urls of a resource class, built from its class attributes only. The
+    resource (and so the attributes of its views) is instantiated on the
+    first request to one of them.
+    """
+    def __init__(self, resource_class):
+        self.resource_class = resource_class
+        self._resource = None
+        self._lock = threading.Lock()
+        self._views = {}
+    
+    @property
+    def resource(self):
+        if self._resource is None:
+            with self._lock:
+                if self._resource is None:
+                    start = time.time()
+                    self._resource = self.resource_class()
+                    logger.debug('Resource %s.%s instantiated in %.2fms', self.resource_class.__module__,
+                        self.resource_class.__name__, (time.time() - start) * 1000)
+        return self._resource
+    
+    def get_view(self, view):
+        # The resource sets the defaults of its own subclass of the view
+        resource = self.resource
+        if view not in self._views:
+            self._views[view] = resource.bound_views.get(view, view).as_view()
+        return self._views[view]
+    
+    def get_dispatcher(self, view):
+        def dispatch(request, *args, **kwargs):
+            return self.get_view(view)(request, *args, **kwargs)
+        dispatch.__name__ = view.__name__
+        dispatch.__module__ = view.__module__
+        return dispatch
+    
+    def get_urls(self, table=None):
+        if table is None:
+            table = self.resource_class.get_class_url_table()
+        dispatchers = {}
+        urls = []
+        for view, pattern, url_name in table:
+            if view not in dispatchers:
+                dispatchers[view] = self.get_dispatcher(view)
+            urls.append(url(pattern, dispatchers[view], name=url_name))
+        return url(self.resource_class.get_class_pattern(), include(urls))
+
 
 class BaseModelResource(Resource):
+    """
+    list_fields and detail_fields are the display_fields of the list and
+    detail views, which only load those fields (see QueryPlanMixin). The
+    export view is only routed if export_fields is set, the JSON views if
+    api_fields is set, and the bulk views if update_fields or bulk_delete is
+    set.
+
+    etag_models and last_modified_field make the list and detail views
+    answer conditional GET requests (see ConditionalMixin), and the cache_*
+    attributes cache their pages (see PageCacheMixin).
+    """
     #'succes_url' is only for edit views like Create, Update and Delete
-    single_attributes = ['model', 'queryset', 'slug_field', 'context_object_name', 'success_url']
-    multiple_attributes = ['allow_empty', 'model', 'queryset', 'paginate_by', 'context_object_name', 'paginator_class']
+    single_attributes = ['model', 'queryset', 'slug_field', 'context_object_name', 'success_url', 'query_budget']
+    multiple_attributes = ['allow_empty', 'model', 'queryset', 'paginate_by', 'context_object_name', 'paginator_class', 'query_budget']
+    # Given by the list view to the export, JSON list and bulk views, so they filter and sort the same
+    list_attributes = ['Sort', 'Filter', 'order_by', 'filter_by', 'filter_class', 'default_order']
+    # Given to the list and detail views, see ConditionalMixin and PageCacheMixin
+    conditional_attributes = ['etag_models', 'etag_timeout', 'last_modified_field']
+    cache_attributes = ['cache_timeout', 'cache_vary_on', 'cache_vary_on_user', 'cache_models']
     
     def __init__(self, **kwargs):
         super(BaseModelResource, self).__init__(**kwargs)
@@ -157,6 +341,61 @@ class BaseModelResource(Resource):
         
         set_attributes_to_inner_classes(self, self.single_attributes, SingleObjectMixin)
         set_attributes_to_inner_classes(self, self.multiple_attributes, MultipleObjectMixin)
+        
+        list_view = self.get_list_view()
+        for name, member in inspect.getmembers(self, inspect.isclass):
+            if list_view and issubclass(member, (ListExportMixin, JSONListMixin, BulkMixin)):
+                self.set_list_attributes(member, list_view)
+            if issubclass(member, ListExportMixin):
+                self.set_view_defaults(member, self, ['export_fields'])
+            if issubclass(member, JSONResponseMixin):
+                self.set_view_defaults(member, self, ['api_fields'])
+            if issubclass(member, BulkMixin):
+                self.set_view_defaults(member, self, ['success_url', 'update_fields', 'bulk_delete'])
+            if hasattr(self, 'list_fields') and issubclass(member, MultipleObjectMixin):
+                member.display_fields = self.list_fields
+            elif hasattr(self, 'detail_fields') and issubclass(member, GenericDetailView):
+                member.display_fields = self.detail_fields
+            if (issubclass(member, PageCacheMixin) and issubclass(member, (MultipleObjectMixin, GenericDetailView, JSONDetailMixin))
+                    and not issubclass(member, BulkMixin)):
+                # The inner views can declare their own policy
+                self.set_view_defaults(member, self, self.conditional_attributes + self.cache_attributes)
+                self.track_models(member)
+            # Check the sort choices at startup
+            if hasattr(member, 'prepare_sort'):
+                member.prepare_sort()
+    
+    def get_list_view(self):
+        "Returns the list view of the resource (the default one, if it's a list)."
+        views = [view for view in self.get_views().values()
+            if issubclass(view, MultipleObjectMixin) and not issubclass(view, (ListExportMixin, JSONListMixin, BulkMixin))]
+        views.sort(key=lambda view: view.name != self.default)
+        if views:
+            return views[0]
+    
+    def set_view_defaults(self, view, source, attributes):
+        "Gives the view the attributes of source it doesn't declare itself."
+        if '_declared_attributes' not in view.__dict__:
+            view._declared_attributes = set(view.__dict__)
+        for attr in attributes:
+            if attr not in view._declared_attributes and hasattr(source, attr):
+                setattr(view, attr, getattr(source, attr))
+    
+    def set_list_attributes(self, view, list_view):
+        self.set_view_defaults(view, list_view, self.list_attributes)
+    
+    def track_models(self, view):
+        """
+        Connects the signals that invalidate the cached pages and ETags of the
+        view now, not on its first request: the models may be saved first
+        (when the app isn't installed, see track_all_models).
+        """
+        models = list(getattr(view, 'etag_models', None) or [])
+        if getattr(view, 'cache_timeout', None) is not None:
+            models += view.cache_models if view.cache_models is not None else [getattr(view, 'model', None)]
+        for model in models:
+            if model is not None:
+                track_model(model)
 
 
 class ModelResourceViewMixin(ResourceViewMixin):
@@ -206,6 +445,27 @@ class ModelResource(BaseModelResource):
             context = ModelResourceViewMixin.get_context_data(self, **context)
             return context
     
+    class BulkUpdate(ModelResourceViewMixin, BulkUpdateView):
+        def get_context_data(self, **kwargs):
+            context = BulkUpdateView.get_context_data(self, **kwargs)
+            context = ModelResourceViewMixin.get_context_data(self, **context)
+            return context
+    
+    class BulkDelete(ModelResourceViewMixin, BulkDeleteView):
+        def get_context_data(self, **kwargs):
+            context = BulkDeleteView.get_context_data(self, **kwargs)
+            context = ModelResourceViewMixin.get_context_data(self, **context)
+            return context
+    
+    class Export(ExportView):
+        pass
+    
+    class ListJson(JSONListView):
+        name = 'list.json'
+    
+    class DetailJson(JSONDetailView):
+        name = 'detail.json'
+    
 
 
 class ResourceView(ResourceViewMixin, TemplateView):
@@ -219,12 +479,46 @@ class ResourceView(ResourceViewMixin, TemplateView):
         template_names +=  TemplateView.get_template_names(self)
         return template_names
 
-def autodiscover(root=True, filter=None):
+def autodiscover(root=True, filter=None, tree=False, lazy=None):
     """
     Auto-discover INSTALLED_APPS views.py modules and fail silently when
     not present. This forces an import on them to register any views bits they
     may want.
+
+    The url patterns are only computed once per process (and per arguments).
+    If RESOURCES_SETTINGS['MANIFEST_PATH'] is set, the resolved resource/url
+    table is also saved there, and reused by the next processes while the
+    source files of the views don't change.
+
+    With lazy=True (RESOURCES_SETTINGS['LAZY'] by default), the urls are built
+    from the resource classes, which are only instantiated on their first
+    request (see LazyResource).
+
+    With tree=True, the patterns are returned inside a single
+    ResourceDispatchTree, which only tries the patterns sharing the static
+    prefix of the path (see tartarus.django.urlresolvers).
     """
+    if lazy is None:
+        lazy = LAZY
+    key = (root, filter, lazy)
+    if key not in _autodiscovered:
+        _autodiscovered[key] = discover_patterns(root, filter, lazy)
+    if tree:
+        tree_key = key + ('tree',)
+        if tree_key not in _autodiscovered:
+            _autodiscovered[tree_key] = [ResourceDispatchTree(_autodiscovered[key])]
+        return list(_autodiscovered[tree_key])
+    return list(_autodiscovered[key])
+
+
+def discover_patterns(root=True, filter=None, lazy=False):
+    del startup_report[:]
+    use_manifest = MANIFEST_PATH and filter is None
+    if use_manifest:
+        try:
+            return load_manifest(MANIFEST_PATH, root, lazy)
+        except (IOError, ValueError, KeyError, ImportError, AttributeError, StaleManifest):
+            del startup_report[:]
 
     # Try to load root views
     if root and settings.PROJECT_NAME not in settings.INSTALLED_APPS:
@@ -233,14 +527,114 @@ def autodiscover(root=True, filter=None):
     for app in settings.INSTALLED_APPS:
         load_app_views(app)
 
-    leafs = get_leaf_subclasses(Resource, filter=filter)
-    resources = [r() for r in leafs if r is not ModelResource]
+    leafs = Resource.get_leaf_subclasses(filter=filter)
     resource_patterns = []
-    for r in resources:
-        resource_patterns += patterns('', r.get_urls())
+    manifest_resources = []
+    for resource_class in leafs:
+        if resource_class is ModelResource:
+            continue
+        start = time.time()
+        if lazy:
+            r = LazyResource(resource_class)
+            table = resource_class.get_class_url_table()
+        else:
+            r = resource_class()
+            table = r.get_url_table()
+        resource_patterns += patterns('', r.get_urls(table))
+        log_startup(resource_class, time.time() - start)
+        # The views are found again by the attribute they are bound to (not their class name)
+        attributes = dict((view, name) for name, view in inspect.getmembers(resource_class if lazy else r, inspect.isclass))
+        manifest_resources.append({
+            'class': '%s.%s' % (resource_class.__module__, resource_class.__name__),
+            'urls': [(attributes[view], pattern, url_name) for view, pattern, url_name in table],
+        })
+    if use_manifest:
+        save_manifest(MANIFEST_PATH, root, manifest_resources)
     return resource_patterns
 
 
+class StaleManifest(Exception):
+    pass
+
+
+def get_manifest_key(root, modules):
+    files = {}
+    for module in modules:
+        filename = getattr(module, '__file__', None)
+        if filename:
+            if filename.endswith(('.pyc', '.pyo')) and os.path.exists(filename[:-1]):
+                filename = filename[:-1]
+            files[filename] = os.path.getmtime(filename)
+    return {
+        'root': root,
+        'project': settings.PROJECT_NAME,
+        'apps': list(settings.INSTALLED_APPS),
+        'files': files,
+    }
+
+
+def get_views_modules(root):
+    apps = list(settings.INSTALLED_APPS)
+    if root:
+        apps.append(settings.PROJECT_NAME)
+    return [sys.modules[name] for name in ['%s.views' % app for app in apps] if name in sys.modules]
+
+
+def save_manifest(path, root, resources):
+    modules = get_views_modules(root)
+    modules += [sys.modules[r['class'].rsplit('.', 1)[0]] for r in resources]
+    modules.append(sys.modules[__name__])
+    manifest = {'key': get_manifest_key(root, set(modules)), 'resources': resources}
+    # Write and rename, so concurrently booting workers never read half a file
+    tmp_path = '%s.%s' % (path, os.getpid())
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.rename(tmp_path, path)
+    except (IOError, OSError):
+        logger.warning('Could not write the resources manifest %s', path, exc_info=True)
+
+
+def load_manifest(path, root, lazy=False):
+    with open(path) as f:
+        manifest = json.load(f)
+    key = manifest['key']
+    if key['root'] != root or key['project'] != settings.PROJECT_NAME or key['apps'] != list(settings.INSTALLED_APPS):
+        raise StaleManifest()
+    for filename, mtime in key['files'].items():
+        if not os.path.exists(filename) or os.path.getmtime(filename) != mtime:
+            raise StaleManifest()
+
+    resource_patterns = []
+    for entry in manifest['resources']:
+        start = time.time()
+        module_name, class_name = entry['class'].rsplit('.', 1)
+        resource_class = getattr(import_module(module_name), class_name)
+        r = LazyResource(resource_class) if lazy else resource_class()
+        views = resource_class if lazy else r
+        table = [(getattr(views, attribute), pattern, url_name) for attribute, pattern, url_name in entry['urls']]
+        resource_patterns += patterns('', r.get_urls(table))
+        log_startup(resource_class, time.time() - start)
+    return resource_patterns
+
+
+def log_startup(resource_class, seconds):
+    startup_report.append((resource_class, seconds))
+    logger.debug('Resource %s.%s loaded in %.2fms', resource_class.__module__, resource_class.__name__, seconds * 1000)
+
+
+def get_startup_report():
+    """
+    Returns the time it took to load each resource (instantiate it and build
+    its urls) in the last autodiscover, slowest first.
+    """
+    lines = []
+    for resource_class, seconds in sorted(startup_report, key=operator.itemgetter(1), reverse=True):
+        lines.append('%8.2fms  %s.%s' % (seconds * 1000, resource_class.__module__, resource_class.__name__))
+    lines.append('%8.2fms  total' % (sum(seconds for r, seconds in startup_report) * 1000))
+    return '\n'.join(lines)
+
+
 def load_app_views(app=None):
     if app:
         mod = import_module(app)
@@ -0,0 +1,175 @@
+"""
+Full-text search backends for tartarus.django.views.search.ListSearchMixin
+
+A backend keeps an index of some fields of a model, updated from the model
+post_save/post_delete signals, and returns the primary keys of the objects
+matching a query, best matches first.
+
+Usage:
+
+    class List(ModelResource.List):
+        class Search:
+            backend = get_backend()
+            backend_fields = ['title', 'content']
+
+A view only registers its model on its first search, so the writes of the
+processes that never searched (workers, admin, management commands) would
+be missed. List the indexed models in the settings, to register them in the
+default backend (get_backend()) when the app is loaded in every process:
+
+    SEARCH_SETTINGS = {
+        'INDEXES': {'blog.post': ['title', 'content']},
+    }
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import get_model
+from django.db.models.signals import post_save, post_delete, class_prepared
+from tartarus.django.cache import get_model_label
+import os
+import sqlite3
+import threading
+
+SEARCH_SETTINGS = getattr(settings, "SEARCH_SETTINGS", {})
+
+RESULTS_LIMIT = SEARCH_SETTINGS.get("RESULTS_LIMIT", 1000)
+# The fields indexed in every process, by model ('app_label.model'), see register_indexes
+INDEXES = dict((label.lower(), fields) for label, fields in SEARCH_SETTINGS.get("INDEXES", {}).items())
+
+
+class SearchBackend(object):
+    def register(self, model, fields):
+        "Indexes the given fields of the model from now on."
+        raise NotImplementedError
+
+    def search(self, model, query, limit=RESULTS_LIMIT):
+        "Returns the primary keys of the objects matching the query, best first."
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    Inverted index stored in a local SQLite database, one FTS5 table per model.
+
+    The index of a model is built from the database the first time it's used,
+    and then updated incrementally. Call rebuild() after bulk changes that
+    don't send signals (e.g. QuerySet.update()).
+    """
+    def __init__(self, path=None):
+        if path is None:
+            path = SEARCH_SETTINGS.get("INDEX_PATH") or \
+                os.path.join(getattr(settings, 'PROJECT_ROOT', os.getcwd()), 'search.db')
+        self.path = path
+        self.fields = {}
+        self._ready = set()
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        # SQLite connections can't be shared between threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path)
+        return connection
+
+    def get_table_name(self, model):
+        return get_model_label(model).replace('.', '_')
+
+    def register(self, model, fields):
+        with self._lock:
+            if model in self.fields:
+                return
+            self.fields[model] = list(fields)
+        # Once per index file, even if several backends use it
+        uid = 'tartarus.search.%s.%s' % (self.path, get_model_label(model))
+        post_save.connect(self.update_instance, sender=model, dispatch_uid=uid, weak=False)
+        post_delete.connect(self.remove_instance, sender=model, dispatch_uid=uid, weak=False)
+
+    def ensure_index(self, model):
+        if model in self._ready:
+            return
+        with self._lock:
+            if model in self._ready:
+                return
+            exists = self.connection.execute("SELECT 1 FROM sqlite_master WHERE name = ?",
+                [self.get_table_name(model)]).fetchone()
+            if not exists:
+                self.rebuild(model)
+            self._ready.add(model)
+
+    def rebuild(self, model):
+        "Drops the index of the model and indexes all its objects again."
+        table = self.get_table_name(model)
+        fields = self.fields[model]
+        with self.connection:
+            self.connection.execute('DROP TABLE IF EXISTS "%s"' % table)
+            self.connection.execute('CREATE VIRTUAL TABLE "%s" USING fts5(pk UNINDEXED, %s)' %
+                (table, ', '.join('"%s"' % field for field in fields)))
+            self.connection.executemany(self.get_insert_sql(model),
+                (self.get_row(model, instance) for instance in model._default_manager.iterator()))
+
+    def get_insert_sql(self, model):
+        return 'INSERT INTO "%s" VALUES (%s)' % (self.get_table_name(model),
+            ', '.join(['?'] * (len(self.fields[model]) + 1)))
+
+    def get_row(self, model, instance):
+        values = [getattr(instance, field) for field in self.fields[model]]
+        return [unicode(instance.pk)] + [unicode(value) if value is not None else u'' for value in values]
+
+    def update_instance(self, sender, instance, **kwargs):
+        self.ensure_index(sender)
+        with self.connection:
+            self.connection.execute('DELETE FROM "%s" WHERE pk = ?' % self.get_table_name(sender),
+                [unicode(instance.pk)])
+            self.connection.execute(self.get_insert_sql(sender), self.get_row(sender, instance))
+
+    def remove_instance(self, sender, instance, **kwargs):
+        self.ensure_index(sender)
+        with self.connection:
+            self.connection.execute('DELETE FROM "%s" WHERE pk = ?' % self.get_table_name(sender),
+                [unicode(instance.pk)])
+
+    def get_match_expression(self, query):
+        # Every word is quoted, so the query syntax can't be used (or broken) by users
+        return u' '.join(u'"%s"' % word.replace(u'"', u'""') for word in query.split())
+
+    def search(self, model, query, limit=RESULTS_LIMIT):
+        self.ensure_index(model)
+        expression = self.get_match_expression(query)
+        if not expression:
+            return []
+        table = self.get_table_name(model)
+        rows = self.connection.execute('SELECT pk FROM "%s" WHERE "%s" MATCH ? ORDER BY rank LIMIT ?' %
+            (table, table), [expression, limit])
+        return [model._meta.pk.to_python(pk) for pk, in rows]
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_backend(path=None):
+    "Returns the SQLiteFTSBackend of the index file (by default, INDEX_PATH), shared by the views of the process."
+    backend = SQLiteFTSBackend(path)
+    with _backends_lock:
+        return _backends.setdefault(backend.path, backend)
+
+def register_index(sender, **kwargs):
+    fields = INDEXES.get(get_model_label(sender))
+    if fields is not None:
+        get_backend().register(sender, fields)
+
+def register_indexes():
+    """
+    Registers the models of SEARCH_SETTINGS['INDEXES'] in the default backend
+    when the app is loaded (see tartarus.django.templatetags.models): the
+    models already loaded now, the other ones when they are prepared.
+    """
+    for label in INDEXES:
+        if label.count('.') != 1:
+            raise ImproperlyConfigured("SEARCH_SETTINGS['INDEXES'] keys are 'app_label.model' labels, not '%s'" % label)
+        app_label, model_name = label.split('.')
+        model = get_model(app_label, model_name, seed_cache=False, only_installed=False)
+        if model is not None:
+            register_index(model)
+    class_prepared.connect(register_index, dispatch_uid='tartarus.search.indexes')
@@ -0,0 +1,63 @@
+"""
+values() based JSON serialization of querysets
+
+A ModelSerializer is compiled once per model and set of fields (see
+get_serializer): it selects the columns with values(), so rows are
+serialized from plain dicts, without building model instances.
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.datastructures import SortedDict
+import threading
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+class ModelSerializer(object):
+    """
+    Serializes the given fields of a model (by default, all its columns).
+    Foreign keys are serialized as the primary key of the related object.
+    """
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+
+    def __init__(self, model, fields=None):
+        self.model = model
+        available = self.get_available_fields(model)
+        if fields is None:
+            fields = available
+        unknown = [field for field in fields if field not in available]
+        if unknown:
+            raise InvalidFields('Unknown fields: %s' % ', '.join(unknown))
+        self.fields = tuple(fields)
+
+    @classmethod
+    def get_available_fields(cls, model):
+        return [field.name for field in model._meta.fields]
+
+    def values(self, queryset, *extra):
+        "The queryset of the rows, with the extra columns (e.g. ordering keys) too."
+        return queryset.values(*(self.fields + tuple(c for c in extra if c not in self.fields)))
+
+    def get_row(self, values):
+        return SortedDict((field, values[field]) for field in self.fields)
+
+    def get_rows(self, rows):
+        return [self.get_row(values) for values in rows]
+
+    def dumps(self, data):
+        return self.encoder.encode(data)
+
+
+_serializers = {}
+_serializers_lock = threading.Lock()
+
+def get_serializer(model, fields=None, serializer_class=ModelSerializer):
+    "Returns the serializer of the fields of the model, compiled once."
+    key = (serializer_class, model, tuple(fields) if fields is not None else None)
+    serializer = _serializers.get(key)
+    if serializer is None:
+        serializer = serializer_class(model, fields)
+        with _serializers_lock:
+            serializer = _serializers.setdefault(key, serializer)
+    return serializer
@@ -1,64 +1,218 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.signals import pre_save
+from tartarus.django.querystring import LazyQuerystring, get_querystring
 from tartarus.utils import underscore_to_label
+import copy
+import threading
+import warnings
+
+SORT_SETTINGS = getattr(settings, "SORT_SETTINGS", {})
+
+# What to do with choices whose ordering isn't backed by an index: 'warn', 'error' or None
+INDEX_CHECK = SORT_SETTINGS.get("INDEX_CHECK", "warn")
+
+class UnindexedSortWarning(RuntimeWarning):
+    pass
+
+# The (model, id, ordering) of the choices already prepared: the tables of
+# several views (e.g. of every resource) hold copies of the same choices
+_prepared = set()
+_prepared_lock = threading.Lock()
+
+class SortTable(object):
+    """
+    The choices of a view, compiled once (per view class, see
+    ListSortedMixin.get_sort_table) and never modified afterwards, so it can be
+    shared by concurrent requests.
+
+    Choices can be given as Choice objects or as tuples of Choice arguments,
+    with an optional dict of keyword arguments at the end:
+
+        SortTable({
+            'title': Choice('title'),
+            'newer_first': ('-date', {'label': 'Date: New to old'}),
+        })
+    """
+    def __init__(self, choices, default=None):
+        compiled = []
+        for id, args in choices.items():
+            compiled.append((id, self.compile_choice(id, args)))
+        self._choices = tuple(compiled)
+        self._choices_dict = dict(compiled)
+        self.default = default or compiled[0][0]
+
+    def compile_choice(self, id, args):
+        if isinstance(args, Choice):
+            # Copy it: the declared choice could be shared by several views
+            choice = copy.copy(args)
+        else:
+            kwargs = args[-1]
+            if isinstance(kwargs, dict):
+                choice = Choice(*args[:-1], **kwargs)
+            else:
+                choice = Choice(*args)
+        choice.id = id
+        return choice
+
+    def __iter__(self):
+        return (choice for id, choice in self._choices)
+
+    def __len__(self):
+        return len(self._choices)
+
+    def __contains__(self, id):
+        return id in self._choices_dict
+
+    def __getitem__(self, id):
+        return self._choices_dict[id]
+
 
 class Sort(object):
+    """
+    Request scoped state of the sorting of a list: the object list, the
+    request and the active choice. The choices themselves come from a shared
+    SortTable (or are compiled from a dict, for this request only).
+    """
     def __init__(self, object_list, choices, request=None, default=None):
         self.object_list = object_list
-        self.default = default
-        if not self.default:
-            self.default = choices.keys()[0]
+        if not isinstance(choices, SortTable):
+            choices = SortTable(choices, default)
+        self.table = choices
+        self.default = default or self.table.default
         self.request = request
-        self.choices_dict = {}
-        for choice, args in choices.items():
-            if isinstance(args, Choice):
-                choice_obj = args
-            else:
-                kwargs = args[-1]
-                if isinstance(kwargs, dict):
-                    choice_obj = Choice(*args[:-1], **kwargs)
-                else:
-                    choice_obj = Choice(*args)
-                
-            choice_obj.sort = self
-            choice_obj.id = choice
-            self.choices_dict[choice] = choice_obj
-        
-        self.choices = self.choices_dict.values()
-        
-        if self.request:
-            self.base_queryset = self.request.GET.copy()
-            self.base_queryset['sort'] = 'sort'
-            self.base_queryset = self.base_queryset.urlencode().replace('%', '%%').replace('sort=sort', 'sort=%s')
+        self.active = None
+        self.choices = [BoundChoice(choice, self) for choice in self.table]
                 
     def get_choice(self, choice):
-        if self.choices_dict.has_key(choice):
-            return self.choices_dict[choice]
+        if choice in self.table:
+            return BoundChoice(self.table[choice], self)
         raise InvalidChoice()
 
     def sort_object_list(self, choice=None):
         if not choice:
             choice = self.default
-        if not isinstance(choice, Choice):
+        if not isinstance(choice, (Choice, BoundChoice)):
             choice = self.get_choice(choice)
+        self.active = choice.id
+        if choice.annotate:
+            self.object_list=self.object_list.annotate(**choice.annotate)
         if choice.extra:
             self.object_list=self.object_list.extra(**choice.extra)
-        self.object_list=self.object_list.order_by(*choice.order_by)
+        self.object_list=self.object_list.order_by(*choice.get_order_by(self.object_list.model))
         
         
         
         
-class ChoiceRepresentation(str):
+class ChoiceRepresentation(LazyQuerystring, str):
     def __new__(cls, choice, querystring):
         obj = str.__new__(cls, choice)
         obj.querystring = querystring
         return obj
         
 class Choice(object):
+    """
+    A way of sorting the list.
+
+    Choice('title')
+    Choice('-date', label='Date: New to old')
+    # Aggregates, computed by the database (can't use an index)
+    Choice('-num_comments', annotate={'num_comments': Count('comment')})
+    # Precomputed column: a model field filled on pre_save, so it can be indexed
+    Choice('-content_length', precompute=lambda post: len(post.content))
+
+    The primary key is appended to the ordering as a tiebreaker (unless the
+    ordering already ends with a unique field), so the order is deterministic
+    and can be paginated with a cursor. Use tiebreaker=False to disable it.
+
+    prepare() checks that the ordering is backed by an index (see INDEX_CHECK),
+    unless the choice is declared as indexed=True.
+    """
     def __init__(self, *args, **kwargs):
         self.order_by = args
         self.id = kwargs.get('id')
         self.extra = kwargs.get('extra', None)
-        self.sort = kwargs.get('sort')            
+        self.annotate = kwargs.get('annotate', None)
+        self.precompute = kwargs.get('precompute', None)
+        self.tiebreaker = kwargs.get('tiebreaker', True)
+        self.indexed = kwargs.get('indexed', False)
         self._label = kwargs.get('label')
+
+    @property
+    def columns(self):
+        return [column.lstrip('-') for column in self.order_by]
+
+    def get_field(self, model, column):
+        if column == 'pk':
+            return model._meta.pk
+        try:
+            return model._meta.get_field(column)
+        except FieldDoesNotExist:
+            return None
+
+    def get_order_by(self, model):
+        "Returns the ordering, with the primary key as tiebreaker if needed."
+        order_by = list(self.order_by)
+        if not self.tiebreaker or not order_by or '?' in order_by:
+            return order_by
+        field = self.get_field(model, self.columns[-1])
+        if field is None or not (field.unique or field.primary_key):
+            order_by.append('-pk' if order_by[-1].startswith('-') else 'pk')
+        return order_by
+
+    def prepare(self, model):
+        """
+        Called once per model at startup: connects the precompute signal and
+        checks the index of the ordering (only once for the copies of the
+        choice).
+        """
+        key = (model, self.id, self.order_by)
+        with _prepared_lock:
+            if key in _prepared:
+                return
+            if self.precompute:
+                column = self.columns[0]
+                def precompute(sender, instance, **kwargs):
+                    setattr(instance, column, self.precompute(instance))
+                pre_save.connect(precompute, sender=model, weak=False,
+                    dispatch_uid='tartarus.sort.precompute.%s.%s.%s' % (model._meta.app_label,
+                        model._meta.object_name, column))
+            if INDEX_CHECK and not self.indexed:
+                problem = self.get_index_problem(model)
+                if problem:
+                    message = 'Sort choice %s of %s.%s: %s' % (self.id, model._meta.app_label,
+                        model._meta.object_name, problem)
+                    if INDEX_CHECK == 'error':
+                        raise ImproperlyConfigured(message)
+                    warnings.warn(message, UnindexedSortWarning)
+            _prepared.add(key)
+
+    def get_index_problem(self, model):
+        "Returns why the ordering can't use an index, or None if it can."
+        columns = self.columns
+        if '?' in columns:
+            return 'random ordering sorts the whole table'
+        for column in columns:
+            if self.extra and column in self.extra.get('select', {}):
+                return "'%s' is an extra select, evaluated on every query (use a precomputed column)" % column
+            if self.annotate and column in self.annotate:
+                return "'%s' is an annotation, evaluated on every query (use a precomputed column)" % column
+            if '__' in column:
+                return "'%s' is a related field, the sort needs a join" % column
+            if self.get_field(model, column) is None:
+                return "'%s' is not a field" % column
+        fields = [self.get_field(model, column) for column in columns]
+        if len(fields) == 1:
+            field = fields[0]
+            if field.db_index or field.unique or field.primary_key:
+                return None
+            return "'%s' has no index (db_index=True)" % columns[0]
+        names = [field.name for field in fields]
+        for index in getattr(model._meta, 'index_together', []):
+            if list(index[:len(names)]) == names:
+                return None
+        return "there's no index_together for %s" % ', '.join(names)
     
     def get_default_label(self):
         return underscore_to_label(self.id)
@@ -66,6 +220,20 @@ class Choice(object):
     @property
     def label(self):
         return self._label or self.get_default_label()
+        
+
+class BoundChoice(object):
+    "A Choice in a request scoped Sort: adds the querystring and the active state."
+    def __init__(self, choice, sort):
+        self.choice = choice
+        self.sort = sort
+
+    def __getattr__(self, name):
+        return getattr(self.choice, name)
+
+    @property
+    def is_active(self):
+        return self.sort.active == self.id
     
     @property
     def queryset(self):
@@ -73,14 +241,11 @@ class Choice(object):
         Returns a query string for the given choice, preserving any
         GET parameters present.
         """
-        if self.sort.base_queryset:
-            return self.sort.base_queryset %self.id
-        
-        return 'sort=%s' %self.id
+        return get_querystring(self.sort.request).replace('sort', self.id)
     
     @property
     def representation(self):
-        return ChoiceRepresentation(self.label, self.queryset)
+        return ChoiceRepresentation(self.label, lambda: self.queryset)
         
 
 class InvalidChoice(Exception):
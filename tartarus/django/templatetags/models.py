@@ -0,0 +1,8 @@
+# Loaded with the installed apps: from now on, saving or deleting any model
+# invalidates its cached data (see tartarus.django.cache), and updates its
+# full-text index if it has one (see tartarus.django.search)
+from tartarus.django.cache import track_all_models
+from tartarus.django.search import register_indexes
+
+track_all_models()
+register_indexes()
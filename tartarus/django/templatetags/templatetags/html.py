@@ -1,24 +1,63 @@
 from django import template
+from django.core.urlresolvers import NoReverseMatch, get_resolver, get_urlconf, get_script_prefix
 from django.template.base import Node
 from django.templatetags.future import url as url_tag
+from django.utils.encoding import smart_str
+from django.utils.html import escape, conditional_escape
+from django.utils.translation import get_language
+from tartarus.django.urlresolvers import get_reverser
 
 register = template.Library()
 
 class LinkNode(Node):
+    """
+    The url is reversed with a compiled Reverser (see get_reverser), so in
+    loops only the arguments are filled in for each row.
+    """
     def __init__(self, url, label):
         self.url = url
-        self.label = label
-    
+        self.label = conditional_escape(label)
+        # (view name, urlconf, language, script prefix) -> reverser, of the last render
+        self._reverser = (None, None)
+
+    def get_reverser(self, view_name, nargs, kwarg_names):
+        key = (view_name, get_urlconf(), get_language(), get_script_prefix())
+        cached_key, reverser = self._reverser
+        if cached_key != key or (reverser is not None and reverser.resolver is not get_resolver(key[1])):
+            reverser = get_reverser(view_name, nargs, kwarg_names)
+            self._reverser = (key, reverser)
+        return reverser
+
+    def get_url(self, context):
+        url = self.url
+        if url.legacy_view_name or url.asvar:
+            return url.render(context)
+        args = [arg.resolve(context) for arg in url.args]
+        kwargs = dict([(smart_str(k, 'ascii'), v.resolve(context)) for k, v in url.kwargs.items()])
+        reverser = self.get_reverser(url.view_name.resolve(context), len(args), kwargs.keys())
+        if reverser is not None:
+            try:
+                return reverser.reverse(args, kwargs)
+            except NoReverseMatch:
+                pass
+        # Let the url tag try again, or raise its error
+        return url.render(context)
+
     def render(self, context):
-        return '<a href="%s">%s</a>' % (self.url.render(context), self.label)
+        return '<a href="%s">%s</a>' % (escape(self.get_url(context)), self.label)
 
 @register.tag
 def link(parser, token):
+    """
+    {% link "posts#detail" post.pk "Post details" %}
+    """
     tokens = token.split_contents()
     contents = token.contents
     label = tokens[-1]
-    contents = contents.replace(tokens[-1], '')
+    contents = contents[:contents.rindex(label)]
     contents = contents.strip()
     token.contents = contents
     url = url_tag(parser, token)
-    return LinkNode(url, label)
\ No newline at end of file
+    if label[0] == label[-1] and label[0] in ('"', "'"):
+        label = label[1:-1]
+    return LinkNode(url, label)
@@ -2,11 +2,55 @@ from django import template
 
 register = template.Library()
 
+# (model class, concrete) -> ((label, attribute), ...)
+_model_fields = {}
+
+def get_model_fields(model, concrete=False):
+    """
+    Returns the (label, attribute) of the fields of the model class, computed
+    once per model.
+
+    With concrete=True, only the columns of the model are returned (foreign
+    keys by their id), so reading them never queries the database.
+    """
+    key = (model, concrete)
+    fields = _model_fields.get(key)
+    if fields is None:
+        if concrete:
+            fields = sorted((field.name, field.attname) for field in model._meta.fields)
+        else:
+            fields = [(name, name) for name in model._meta.get_all_field_names()]
+        fields.reverse()
+        fields = _model_fields[key] = tuple(fields)
+    return fields
+
+def get_path_value(obj, path):
+    """
+    Follows a lookup path ('tag__name', 'comment_set__text'), returning a
+    list for the multiple valued relations.
+    """
+    parts = path.split('__')
+    for i, part in enumerate(parts):
+        obj = getattr(obj, part, None)
+        if obj is None:
+            return None
+        if hasattr(obj, 'get_query_set'):
+            # Related manager
+            obj = obj.all()
+            rest = '__'.join(parts[i + 1:])
+            return [get_path_value(o, rest) for o in obj] if rest else list(obj)
+        if callable(obj):
+            obj = obj()
+    return obj
+
 @register.filter
-def model_fields(model):
-    fields = []
-    for field_name in model._meta.get_all_field_names():
-        field = {'label':field_name, 'data':getattr(model, field_name)}
-        fields.append(field)
-    fields.reverse()
-    return fields
\ No newline at end of file
+def model_fields(model, option=None):
+    """
+    {{ object|model_fields }}
+    {{ object|model_fields:"concrete" }}
+    {{ object|model_fields:display_fields }}
+    """
+    if isinstance(option, (list, tuple)):
+        return [{'label': path, 'data': get_path_value(model, path)} for path in option]
+    return [{'label': label, 'data': getattr(model, attribute)}
+        for label, attribute in get_model_fields(type(model), option == 'concrete')]
@@ -1,24 +1,107 @@
-from django.template.base import TemplateSyntaxError, Library, token_kwargs
+from django.core.cache import cache
+from django.db.models import Model
+from django.db.models.query import QuerySet
+from django.template.base import TemplateSyntaxError, Library, Node, Variable, VariableDoesNotExist, token_kwargs
 from django.template.loader_tags import do_include, IncludeNode
-from django.template.loader import select_template
+from django.template import loader
+from django.template.loader import find_template, get_template_from_string
+from django.template import TemplateDoesNotExist
 from django.conf import settings
+from django.utils import translation
+from tartarus.collection import LRUCache
+from tartarus.django.cache import get_generation, get_query_sql, make_key
+import logging
 import os
 
+RESOURCES_SETTINGS = getattr(settings, "RESOURCES_SETTINGS", {})
+
+# Maximum number of (resource, template name) resolutions cached by the include tag
+INCLUDE_CACHE_SIZE = RESOURCES_SETTINGS.get("INCLUDE_CACHE_SIZE", 256)
+
+logger = logging.getLogger('tartarus.resources')
+
 register = Library()
 
-class ResourceIncludeNode(IncludeNode):
-    def render(self, context):
+# (resource, template_name) -> (template, path, mtime)
+include_cache = LRUCache(INCLUDE_CACHE_SIZE)
+
+def get_include_cache_stats():
+    "Returns the hits, misses and size of the include template cache."
+    return include_cache.stats()
+
+def find_include_template(template_names):
+    "Same as select_template, but also returns the name of the template found."
+    for template_name in template_names:
         try:
-            template_name = self.template_name.resolve(context)
+            template, origin = find_template(template_name)
+        except TemplateDoesNotExist:
+            continue
+        if not hasattr(template, 'render'):
+            template = get_template_from_string(template, origin, template_name)
+        return template, template_name
+    raise TemplateDoesNotExist(', '.join(template_names))
+
+def get_template_path(template_name, loaders=None):
+    "Returns the file of the template, as found by the template loaders."
+    if loaders is None:
+        loaders = loader.template_source_loaders or ()
+    for template_loader in loaders:
+        if hasattr(template_loader, 'loaders'):
+            # Cached loader
+            path = get_template_path(template_name, template_loader.loaders)
+        else:
+            try:
+                source, path = template_loader.load_template_source(template_name)
+            except (TemplateDoesNotExist, NotImplementedError):
+                continue
+        if path:
+            return path
+
+def is_fresh(entry):
+    template, path, mtime = entry
+    if not settings.DEBUG or path is None:
+        return True
+    try:
+        return os.path.getmtime(path) == mtime
+    except OSError:
+        return False
+
+class ResourceIncludeNode(IncludeNode):
+    """
+    Includes the template of the resource (<resource>/<template_name>) if it
+    exists, or else the template itself.
+
+    The resolved templates are cached (see INCLUDE_CACHE_SIZE). When DEBUG is
+    True, they are loaded again if their file changes.
+    """
+    def get_template(self, context):
+        template_name = self.template_name.resolve(context)
+        resource = context['resource'] if context.has_key('resource') else None
+        key = (resource and unicode(resource), template_name)
+        entry = include_cache.get(key, validate=is_fresh)
+        if entry is None:
             template_names = []
-            if context.has_key('resource'):
-                template_names.append(os.path.join(context['resource'], template_name))
+            if resource:
+                template_names.append(os.path.join(resource, template_name))
             template_names.append(template_name)
-            template = select_template(template_names)
+            template, name = find_include_template(template_names)
+            path = mtime = None
+            if settings.DEBUG:
+                path = get_template_path(name)
+                if path and os.path.exists(path):
+                    mtime = os.path.getmtime(path)
+            entry = (template, path, mtime)
+            include_cache.set(key, entry)
+        return entry[0]
+
+    def render(self, context):
+        try:
+            template = self.get_template(context)
             return self.render_template(template, context)
-        except:
+        except Exception:
             if settings.TEMPLATE_DEBUG:
                 raise
+            logger.warning('Could not include %s', self.template_name, exc_info=True)
             return ''
 
 @register.tag('include')
@@ -49,3 +132,60 @@ def do_resource_include(parser, token):
     path = bits[1]
     return ResourceIncludeNode(parser.compile_filter(bits[1]), extra_context=namemap,
                        isolated_context=isolated_context)
+
+
+class ResourceCacheNode(Node):
+    """
+    Caches a fragment of the template, like the cache tag, and invalidates
+    it when the model of a vary_on object or queryset changes (see
+    tartarus.django.cache).
+    """
+    def __init__(self, nodelist, timeout, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.timeout = Variable(timeout)
+        self.fragment_name = fragment_name
+        self.vary_on = [Variable(var) for var in vary_on]
+
+    def get_vary_value(self, value):
+        if isinstance(value, Model):
+            return (type(value)._meta.db_table, value.pk, get_generation(type(value)))
+        if isinstance(value, QuerySet):
+            # The rows are shown in order
+            sql = get_query_sql(value, ordered=True)
+            if sql is None:
+                # No rows, whatever the query
+                return (value.model._meta.db_table, None)
+            return (sql, get_generation(value.model))
+        return unicode(value)
+
+    def render(self, context):
+        try:
+            timeout = int(self.timeout.resolve(context))
+        except (VariableDoesNotExist, ValueError, TypeError):
+            raise TemplateSyntaxError('"resource_cache" tag got an invalid timeout: %r' % self.timeout.var)
+        resource = context['resource'] if context.has_key('resource') else None
+        parts = [resource and unicode(resource), self.fragment_name, translation.get_language()]
+        parts += [self.get_vary_value(var.resolve(context)) for var in self.vary_on]
+        key = make_key('fragment', *parts)
+        value = cache.get(key)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, timeout)
+        return value
+
+@register.tag('resource_cache')
+def do_resource_cache(parser, token):
+    """
+    {% resource_cache 600 sidebar object_list %}
+        .. expensive fragment ..
+    {% endresource_cache %}
+
+    The fragment is cached per resource and per vary_on value; saving or
+    deleting an object of the model of object_list invalidates it.
+    """
+    nodelist = parser.parse(('endresource_cache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise TemplateSyntaxError(u"%r tag requires at least 2 arguments." % bits[0])
+    return ResourceCacheNode(nodelist, bits[1], bits[2], bits[3:])
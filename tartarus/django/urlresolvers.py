@@ -0,0 +1,202 @@
+"""
+Prefix tree dispatch for the resource url patterns
+
+Django tries the url patterns one by one. ResourceDispatchTree indexes them
+by their leading static path segments (e.g. 'posts' in
+'^posts/' + '^(?P<pk>\d+)/update$'), so only the patterns that share the static
+prefix of the path are matched with their regex, in the original order.
+
+Usage (urls.py):
+
+    urlpatterns += resources.autodiscover(tree=True)
+
+It resolves to the same views as the flat list of patterns (when no pattern
+matches, the flat list is tried to build the usual 404 information), and
+reverse() is unchanged.
+
+get_reverser() compiles reverse() for a url name, for templates that reverse
+the same name many times (see the link tag).
+"""
+from django.conf import settings
+from django.core.urlresolvers import RegexURLResolver, ResolverMatch, Resolver404, NoReverseMatch, \
+    get_resolver, get_urlconf, get_script_prefix
+from django.utils.encoding import smart_str, force_unicode, iri_to_uri
+from django.utils.regex_helper import normalize
+from django.utils.translation import get_language
+from tartarus.collection import LRUCache
+import re
+
+RESOURCES_SETTINGS = getattr(settings, "RESOURCES_SETTINGS", {})
+
+# Maximum number of url names (and argument signatures) compiled by get_reverser
+REVERSERS_CACHE_SIZE = RESOURCES_SETTINGS.get("REVERSERS_CACHE_SIZE", 512)
+
+# A static segment can't contain any of these
+REGEX_CHARACTERS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+class DispatchNode(object):
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = []
+
+
+class ResourceDispatchTree(RegexURLResolver):
+    def __init__(self, urlconf_name, default_kwargs=None, app_name=None, namespace=None):
+        super(ResourceDispatchTree, self).__init__(r'^', urlconf_name, default_kwargs, app_name, namespace)
+        self._tree = None
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            tree = DispatchNode()
+            for index, pattern in enumerate(self.url_patterns):
+                self.add_pattern(tree, [pattern], (index,))
+            self._tree = tree
+        return self._tree
+
+    def add_pattern(self, tree, chain, order):
+        pattern = chain[-1]
+        if isinstance(pattern, RegexURLResolver):
+            for index, sub_pattern in enumerate(pattern.url_patterns):
+                self.add_pattern(tree, chain + [sub_pattern], order + (index,))
+            return
+        node = tree
+        for segment in self.get_static_segments(chain):
+            node = node.children.setdefault(segment, DispatchNode())
+        node.entries.append((order, chain))
+
+    def get_static_segments(self, chain):
+        """
+        Returns the static path segments every path matching the chain of
+        patterns starts with.
+        """
+        regex = ''
+        for pattern in chain:
+            part = pattern.regex.pattern
+            if not part.startswith('^') or '|' in part:
+                # Unanchored or alternatives: anything could match from here
+                break
+            regex += part[1:]
+        segments = regex.split('/')
+        static = []
+        for i, segment in enumerate(segments):
+            last = i == len(segments) - 1
+            if last and segment.endswith('$') and not REGEX_CHARACTERS.search(segment[:-1]):
+                # Exact end of the path
+                static.append(segment[:-1])
+            elif last or REGEX_CHARACTERS.search(segment):
+                break
+            else:
+                static.append(segment)
+        return static
+
+    def get_candidates(self, path):
+        "Returns the chains of patterns that could match the path, in url order."
+        node = self.tree
+        entries = list(node.entries)
+        for segment in path.split('/'):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            entries += node.entries
+        entries.sort()
+        return [chain for order, chain in entries]
+
+    def resolve_chain(self, path, chain):
+        "Same as RegexURLResolver.resolve, following a single chain of patterns."
+        resolver = chain[0]
+        if len(chain) == 1:
+            try:
+                return resolver.resolve(path)
+            except Resolver404:
+                return None
+        match = resolver.regex.search(path)
+        if not match:
+            return None
+        sub_match = self.resolve_chain(path[match.end():], chain[1:])
+        if not sub_match:
+            return None
+        sub_match_dict = dict([(smart_str(k), v) for k, v in match.groupdict().items()])
+        sub_match_dict.update(resolver.default_kwargs)
+        for k, v in sub_match.kwargs.iteritems():
+            sub_match_dict[smart_str(k)] = v
+        return ResolverMatch(sub_match.func, sub_match.args, sub_match_dict, sub_match.url_name,
+            resolver.app_name or sub_match.app_name, [resolver.namespace] + sub_match.namespaces)
+
+    def resolve(self, path):
+        for chain in self.get_candidates(path):
+            match = self.resolve_chain(path, [self] + chain)
+            if match:
+                return match
+        # Let the flat patterns raise the Resolver404, with everything tried
+        return super(ResourceDispatchTree, self).resolve(path)
+
+
+class Reverser(object):
+    """
+    reverse() compiled for a url name and a signature of arguments (the number
+    of positional arguments, or the names of the keyword arguments): the url
+    patterns are looked up once, and each call only fills in the arguments and
+    checks them against the patterns.
+
+    Use get_reverser() to get them.
+    """
+    def __init__(self, resolver, prefix, view_name, nargs, kwarg_names):
+        self.resolver = resolver
+        self.view_name = view_name
+        prefix_norm, prefix_args = normalize(prefix)[0]
+        self.candidates = []
+        for possibility, pattern, defaults in resolver.reverse_dict.getlist(view_name):
+            for result, params in possibility:
+                if nargs:
+                    if nargs != len(params) + len(prefix_args):
+                        continue
+                elif set(kwarg_names) | set(defaults) != set(params) | set(defaults) | set(prefix_args):
+                    continue
+                self.candidates.append((prefix_norm + result, prefix_args + params, defaults,
+                    re.compile(u'^%s%s' % (prefix, pattern), re.UNICODE)))
+
+    def reverse(self, args=None, kwargs=None):
+        "Same as reverse(view_name, args=args, kwargs=kwargs)."
+        args = [force_unicode(value) for value in args or ()]
+        kwargs = kwargs or {}
+        for result, params, defaults, regex in self.candidates:
+            if args:
+                candidate = result % dict(zip(params, args))
+            else:
+                if [k for k, v in defaults.items() if kwargs.get(k, v) != v]:
+                    continue
+                candidate = result % dict([(k, force_unicode(v)) for k, v in kwargs.items()])
+            if regex.search(candidate):
+                if candidate.startswith('//'):
+                    candidate = '/%%2F%s' % candidate[2:]
+                return iri_to_uri(candidate)
+        raise NoReverseMatch("Reverse for '%s' with arguments '%s' and keyword arguments '%s' not found." %
+            (self.view_name, args, kwargs))
+
+
+_reversers = LRUCache(REVERSERS_CACHE_SIZE)
+
+def get_reverser(view_name, nargs=0, kwarg_names=()):
+    """
+    Returns the Reverser of the url name for the current urlconf and script
+    prefix, or None if the name can't be compiled (namespaced names, view
+    callables or paths), in which case reverse() must be used.
+    """
+    if not isinstance(view_name, basestring) or ':' in view_name:
+        return None
+    resolver = get_resolver(get_urlconf())
+    prefix = get_script_prefix()
+    # The patterns can be translated
+    key = (id(resolver), get_language(), prefix, view_name, nargs, tuple(sorted(kwarg_names)))
+    reverser = _reversers.get(key)
+    if reverser is None or reverser.resolver is not resolver:
+        resolver.reverse_dict  # Populates the resolver
+        if view_name in resolver._callback_strs:
+            return None
+        reverser = Reverser(resolver, prefix, view_name, nargs, kwarg_names)
+        _reversers.set(key, reverser)
+    return reverser
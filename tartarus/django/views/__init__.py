@@ -1,7 +1,11 @@
 from tartarus.django.views.pagination import ListPaginatedView
 from tartarus.django.views.sort import ListSortedView
 from tartarus.django.views.base import ListView
-from django.views.generic import DetailView, CreateView, UpdateView, DeleteView, TemplateView
+from tartarus.django.views.queryplan import DetailView
+from tartarus.django.views.export import ExportView
+from tartarus.django.views.api import JSONListView, JSONDetailView
+from tartarus.django.views.bulk import BulkUpdateView, BulkDeleteView
+from django.views.generic import CreateView, UpdateView, DeleteView, TemplateView
 
 try: 
     import django_filters
@@ -0,0 +1,156 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.utils.datastructures import SortedDict
+from django.views.generic import View
+from django.views.generic.detail import SingleObjectMixin
+from django.views.generic.list import MultipleObjectMixin
+from tartarus.django.pagination import CursorPaginator, Paginator, InvalidPage
+from tartarus.django.serializers import ModelSerializer, InvalidFields, get_serializer
+from tartarus.django.views.conditional import ConditionalMixin
+from tartarus.django.views.pagecache import PageCacheMixin
+from tartarus.django.views.filter import ListFilteredMixin
+from tartarus.django.views.sort import ListSortedMixin
+
+"""
+Example:
+
+
+    class ListJson(JSONListView):
+        model = Post
+        name = 'list.json'
+        api_fields = ['id', 'title', 'date', 'tag']
+
+    class DetailJson(JSONDetailView):
+        model = Post
+        name = 'detail.json'
+        api_fields = ['id', 'title', 'content', 'date', 'tag']
+
+    /posts/list.json?status=p&sort=newer_first&fields=id,title
+    /posts/3.json
+"""
+
+class JSONResponseMixin(ConditionalMixin, PageCacheMixin):
+    """
+    Mixin for views that serialize their objects with a values() queryset
+    (see tartarus.django.serializers) instead of rendering a template.
+
+    The fields are api_fields, or the ones of them requested in the fields
+    parameter (?fields=id,title). Nothing is exposed by default: the
+    resources only route the view when api_fields is set (see
+    Resource.is_view_enabled).
+
+    Conditional GET requests are answered, and the pages cached, like in the
+    resource views (see ConditionalMixin and PageCacheMixin).
+    """
+    api_fields = None
+    enabled_by = 'api_fields'
+    fields_param = 'fields'
+    serializer_class = ModelSerializer
+    suffix = '.json'
+
+    def get_model(self):
+        return self.model or self.get_queryset().model
+
+    def get_api_fields(self, model):
+        if not self.api_fields:
+            raise ImproperlyConfigured('%s needs api_fields' % type(self).__name__)
+        fields = list(self.api_fields)
+        requested = self.request.GET.get(self.fields_param)
+        if requested:
+            requested = [field.strip() for field in requested.split(',') if field.strip()]
+            unknown = [field for field in requested if field not in fields]
+            if unknown:
+                raise InvalidFields('Unknown fields: %s' % ', '.join(unknown))
+            fields = requested
+        return fields
+
+    def get_serializer(self):
+        model = self.get_model()
+        return get_serializer(model, self.get_api_fields(model), self.serializer_class)
+
+    def render_to_json(self, data, status=200):
+        return HttpResponse(self.serializer_class.encoder.encode(data),
+            content_type='application/json; charset=utf-8', status=status)
+
+    def render_json_error(self, error, status=400):
+        return self.render_to_json({'error': unicode(error)}, status=status)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super(JSONResponseMixin, self).dispatch(request, *args, **kwargs)
+        except InvalidFields, e:
+            return self.render_json_error(e)
+
+
+class JSONListMixin(JSONResponseMixin):
+    """
+    Serializes a page of the object list, filtered and sorted like the list
+    view, paginated with a cursor (see CursorPaginator):
+
+        {"objects": [...], "next": "/posts/list.json?cursor=...", "previous": null}
+
+    Lists sorted randomly, by an extra select or by a nullable column can't
+    be seeked, so they are paginated by page number instead (?page=2).
+    """
+    stages = ('filter', 'sort')
+    cursor_paginator_class = CursorPaginator
+    fallback_paginator_class = Paginator
+    paginate_by = 10
+
+    def get_json_queryset(self):
+        queryset = self.get_queryset()
+        context = {}
+        for name in self.stages:
+            queryset = getattr(self, '%s_stage' % name)(queryset, context)
+        return queryset
+
+    def get_json_page(self, queryset, serializer):
+        try:
+            paginator = self.cursor_paginator_class(queryset, self.paginate_by, request=self.request)
+        except ImproperlyConfigured:
+            # The extra select columns must be selected to be ordered by
+            paginator = self.fallback_paginator_class(serializer.values(queryset, *queryset.query.extra_select),
+                self.paginate_by, request=self.request)
+            return paginator.page(self.request.GET.get('page') or 1)
+        # The ordering columns are selected too, to build the cursors
+        keys = [field for field, descending in paginator.ordering]
+        paginator.object_list = serializer.values(queryset, *keys)
+        return paginator.page()
+
+    def get_link(self, page, direction):
+        "The url of the next or previous page (a cursor or a page number)."
+        if not getattr(page, 'has_%s' % direction)():
+            return None
+        link = getattr(page, '%s_page_number' % direction)()
+        return '%s?%s' % (self.request.path, link.querystring)
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        try:
+            page = self.get_json_page(self.get_json_queryset(), serializer)
+        except InvalidPage, e:
+            return self.render_json_error(e, 404)
+        return self.render_to_json(SortedDict([
+            ('objects', serializer.get_rows(page.object_list)),
+            ('next', self.get_link(page, 'next')),
+            ('previous', self.get_link(page, 'previous')),
+        ]))
+
+
+class JSONDetailMixin(JSONResponseMixin):
+    "Serializes the object found by get_object (by pk or slug)."
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        values = self.get_object(serializer.values(self.get_queryset()))
+        return self.render_to_json(serializer.get_row(values))
+
+
+class JSONListView(JSONListMixin, ListSortedMixin, ListFilteredMixin, MultipleObjectMixin, View):
+    """
+    Serializes the object list, see JSONListMixin
+    """
+
+class JSONDetailView(JSONDetailMixin, SingleObjectMixin, View):
+    """
+    Serializes an object, see JSONDetailMixin
+    """
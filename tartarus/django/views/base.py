@@ -1,11 +1,40 @@
 from tartarus.django.views.pagination import ListPaginatedMixin
 from tartarus.django.views.sort import ListSortedMixin
 from tartarus.django.views.filter import ListFilteredMixin
+from tartarus.django.views.queryplan import QueryPlanMixin
+from django.utils.datastructures import SortedDict
 from django.views.generic import ListView
+import time
 
-class ListView(ListSortedMixin, ListFilteredMixin, ListPaginatedMixin, ListView):
-    def get_context_data(self, **context):
-        context = ListSortedMixin.get_context_data(self, **context)
-        context = ListFilteredMixin.get_context_data(self, **context)
-        context = ListPaginatedMixin.get_context_data(self, **context)
-        return context
\ No newline at end of file
+class ListView(QueryPlanMixin, ListSortedMixin, ListFilteredMixin, ListPaginatedMixin, ListView):
+    """
+    A list view that can be filtered, sorted and paginated, and that only
+    loads its display_fields (see QueryPlanMixin).
+
+    The object list goes through each stage in ``stages``, in order. A stage is
+    a '<name>_stage(queryset, context)' method that updates the context and
+    returns the new queryset, so the stages only build one lazy queryset: the
+    database is hit for the count (when paginating) and for the page rows.
+
+    The time spent in each stage is available as ``stage_timings``, in the view
+    and in the context.
+    """
+    stages = ('filter', 'sort', 'paginate')
+
+    def get_context_data(self, **kwargs):
+        context = {}
+        queryset = kwargs.pop('object_list')
+        self.stage_timings = SortedDict()
+        for name in self.stages:
+            start = time.time()
+            queryset = getattr(self, '%s_stage' % name)(queryset, context)
+            self.stage_timings[name] = time.time() - start
+        context['object_list'] = queryset
+        context['stage_timings'] = self.stage_timings
+        context['display_fields'] = self.get_display_fields()
+
+        context.update(kwargs)
+        context_object_name = self.get_context_object_name(queryset)
+        if context_object_name is not None:
+            context[context_object_name] = queryset
+        return context
@@ -0,0 +1,208 @@
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.forms.models import modelform_factory
+from django.http import HttpResponse, HttpResponseRedirect
+from django.views.generic import View
+from django.views.generic.list import MultipleObjectMixin, MultipleObjectTemplateResponseMixin
+from tartarus.django.cache import bump_generation, make_key
+from tartarus.django.serializers import ModelSerializer
+from tartarus.django.views.filter import ListFilteredMixin
+
+"""
+Example:
+
+
+    class BulkUpdate(BulkUpdateView):
+        model = Post
+        update_fields = ['status', 'tag']
+
+    class BulkDelete(BulkDeleteView):
+        model = Post
+        bulk_delete = True
+
+    # Publish the selected posts
+    POST /posts/bulk-update?status=d  pk=1&pk=2&pk=5&status=p
+    # Publish every draft
+    POST /posts/bulk-update?status=d  all=1&status=p&progress=<token>
+    # Meanwhile, {"done": 1500, "total": 4000}
+    GET /posts/bulk-update?progress=<token>
+"""
+
+class BulkMixin(object):
+    """
+    Mixin for views that change many objects at once: the ones selected in
+    the filtered list (the pk parameter), or all of them (the all parameter),
+    filtered like the list view (the querystring).
+
+    The objects are processed in chunks of chunk_size primary keys, inside
+    one transaction. If a progress token is given, the number of objects
+    done is stored in the cache for GET ?progress=<token> requests.
+
+    A GET request renders the confirmation template, with the selected
+    objects and their count.
+
+    Only the users allowed by has_bulk_permission (by default, the active
+    staff users) can use the view, and the resources only route it when it's
+    enabled (update_fields for BulkUpdateMixin, bulk_delete for
+    BulkDeleteMixin, see Resource.is_view_enabled).
+    """
+    stages = ('filter',)
+    selection_param = 'pk'
+    all_param = 'all'
+    progress_param = 'progress'
+    progress_timeout = 60 * 60
+    chunk_size = 500
+    success_url = None
+
+    def get_params(self):
+        return self.request.POST if self.request.method == 'POST' else self.request.GET
+
+    def get_bulk_queryset(self):
+        queryset = self.get_queryset()
+        context = {}
+        for name in self.stages:
+            queryset = getattr(self, '%s_stage' % name)(queryset, context)
+        params = self.get_params()
+        if not params.get(self.all_param):
+            pks = params.getlist(self.selection_param)
+            # An empty pk__in can't be counted
+            queryset = queryset.filter(pk__in=pks) if pks else queryset.none()
+        return queryset
+
+    def get_chunks(self, queryset):
+        "Yields the primary keys of the objects, in chunks (seeking on the primary key)."
+        pks = queryset.order_by('pk').values_list('pk', flat=True)
+        last = None
+        while True:
+            chunk = list((pks.filter(pk__gt=last) if last is not None else pks)[:self.chunk_size])
+            if chunk:
+                yield chunk
+            if len(chunk) < self.chunk_size:
+                break
+            last = chunk[-1]
+
+    def get_progress_key(self, token):
+        return make_key('bulk', type(self).__module__, type(self).__name__, token)
+
+    def set_progress(self, done, total):
+        token = self.get_params().get(self.progress_param)
+        if token:
+            cache.set(self.get_progress_key(token), {'done': done, 'total': total}, self.progress_timeout)
+
+    def process_chunk(self, queryset):
+        "Changes the objects of the queryset (a chunk)."
+        raise NotImplementedError
+
+    def process(self, queryset):
+        "Processes every chunk in one transaction, and returns the number of objects."
+        model = queryset.model
+        total = queryset.count()
+        done = 0
+        self.set_progress(done, total)
+        if not total:
+            return done
+        with transaction.commit_on_success(using=queryset.db):
+            for pks in self.get_chunks(queryset):
+                self.process_chunk(model._default_manager.using(queryset.db).filter(pk__in=pks))
+                done += len(pks)
+                self.set_progress(done, total)
+        # update() doesn't send the signals that invalidate the cached pages
+        bump_generation(model)
+        return done
+
+    def get_success_url(self):
+        return self.success_url or self.request.get_full_path()
+
+    def render_to_json(self, data, status=200):
+        return HttpResponse(ModelSerializer.encoder.encode(data),
+            content_type='application/json; charset=utf-8', status=status)
+
+    def get_context_data(self, **kwargs):
+        # For the template names, like in ListView
+        self.object_list = queryset = self.get_bulk_queryset()
+        kwargs.setdefault('object_list', queryset)
+        kwargs.setdefault('count', queryset.count())
+        return super(BulkMixin, self).get_context_data(**kwargs)
+
+    def has_bulk_permission(self, request):
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_active and user.is_staff
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.has_bulk_permission(request):
+            raise PermissionDenied
+        return super(BulkMixin, self).dispatch(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        token = request.GET.get(self.progress_param)
+        if token:
+            progress = cache.get(self.get_progress_key(token))
+            if progress is None:
+                return self.render_to_json({'error': 'Unknown progress token'}, status=404)
+            return self.render_to_json(progress)
+        return self.render_to_response(self.get_context_data())
+
+    def done(self, count):
+        if self.request.is_ajax():
+            return self.render_to_json({'count': count})
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class BulkUpdateMixin(BulkMixin):
+    """
+    Sets the update_fields given in the request (validated by a model form)
+    with a single update() query per chunk. Only the fields of the model
+    table can be updated this way (not the many to many fields).
+    """
+    update_fields = ()
+    enabled_by = 'update_fields'
+
+    def get_form(self):
+        if self.request.method != 'POST':
+            return modelform_factory(self.get_queryset().model, fields=list(self.update_fields))()
+        # Only the fields sent are changed
+        fields = [field for field in self.update_fields if field in self.request.POST]
+        return modelform_factory(self.get_queryset().model, fields=fields)(self.request.POST)
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault('form', self.get_form())
+        return super(BulkUpdateMixin, self).get_context_data(**kwargs)
+
+    def process_chunk(self, queryset):
+        queryset.update(**self.values)
+
+    def post(self, request, *args, **kwargs):
+        form = self.get_form()
+        if not form.is_valid() or not form.cleaned_data:
+            return self.render_to_response(self.get_context_data(form=form))
+        self.values = form.cleaned_data
+        return self.done(self.process(self.get_bulk_queryset()))
+
+
+class BulkDeleteMixin(BulkMixin):
+    """
+    Deletes the objects, chunk by chunk, with QuerySet.delete() (which also
+    deletes the related objects and sends the delete signals).
+    """
+    bulk_delete = False
+    enabled_by = 'bulk_delete'
+
+    def process_chunk(self, queryset):
+        queryset.delete()
+
+    def post(self, request, *args, **kwargs):
+        return self.done(self.process(self.get_bulk_queryset()))
+
+
+class BulkUpdateView(BulkUpdateMixin, ListFilteredMixin, MultipleObjectTemplateResponseMixin, MultipleObjectMixin, View):
+    """
+    Updates many objects, see BulkUpdateMixin
+    """
+    template_name_suffix = '_bulk_update'
+
+class BulkDeleteView(BulkDeleteMixin, ListFilteredMixin, MultipleObjectTemplateResponseMixin, MultipleObjectMixin, View):
+    """
+    Deletes many objects, see BulkDeleteMixin
+    """
+    template_name_suffix = '_bulk_delete'
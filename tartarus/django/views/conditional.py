@@ -0,0 +1,70 @@
+from django.db.models import Max
+from django.views.decorators.http import condition
+from django.views.generic.detail import SingleObjectMixin
+from tartarus.django.cache import get_generation
+import hashlib
+import time
+
+"""
+Example:
+
+
+    class Detail(ModelResource.Detail):
+        # The ETag changes when a Post or a Tag is saved or deleted
+        etag_models = [Post, Tag]
+        # Last-Modified is the updated_at of the post
+        last_modified_field = 'updated_at'
+
+A request with a matching If-None-Match (or If-Modified-Since) gets a 304
+response, before the queryset or the template are evaluated.
+"""
+
+class ConditionalMixin(object):
+    """
+    Mixin for class-based views: answers conditional GET requests, with the
+    ETag and Last-Modified given by get_etag and get_last_modified.
+
+    These should be cheap: by default the ETag is built from the generation
+    counters of etag_models (see tartarus.django.cache), and Last-Modified is
+    the max() of last_modified_field in the queryset (for a list, note that
+    deleting an object doesn't change it).
+
+    The ETag also changes every etag_timeout seconds, which bounds how long a
+    missed invalidation (see tartarus.django.cache) can keep a stale page.
+    """
+    etag_models = None
+    etag_timeout = 5 * 60
+    last_modified_field = None
+
+    def get_etag(self, request, *args, **kwargs):
+        if not self.etag_models:
+            return None
+        parts = [type(self).__module__, type(self).__name__, request.get_full_path()]
+        parts += [get_generation(model) for model in self.etag_models]
+        if self.etag_timeout:
+            parts.append(int(time.time()) // self.etag_timeout)
+        # Templates may show the user
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated():
+            parts.append(user.pk)
+        return hashlib.md5(repr(parts)).hexdigest()
+
+    def get_last_modified(self, request, *args, **kwargs):
+        if not self.last_modified_field:
+            return None
+        queryset = self.get_queryset()
+        if isinstance(self, SingleObjectMixin):
+            pk = kwargs.get(self.pk_url_kwarg)
+            slug = kwargs.get(self.slug_url_kwarg)
+            if pk is not None:
+                queryset = queryset.filter(pk=pk)
+            elif slug is not None:
+                queryset = queryset.filter(**{self.get_slug_field(): slug})
+        return queryset.aggregate(last_modified=Max(self.last_modified_field))['last_modified']
+
+    def dispatch(self, request, *args, **kwargs):
+        dispatch = super(ConditionalMixin, self).dispatch
+        if request.method not in ('GET', 'HEAD'):
+            return dispatch(request, *args, **kwargs)
+        return condition(etag_func=self.get_etag, last_modified_func=self.get_last_modified)(dispatch)(
+            request, *args, **kwargs)
@@ -0,0 +1,125 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, Http404
+from django.utils.datastructures import SortedDict
+from django.views.generic import View
+from django.views.generic.list import MultipleObjectMixin
+from tartarus.django.pagination import CursorPaginator
+from tartarus.django.views.filter import ListFilteredMixin
+from tartarus.django.views.sort import ListSortedMixin
+import csv
+
+try:
+    from django.http import StreamingHttpResponse
+except ImportError:
+    # Django < 1.5: HttpResponse also streams an iterator, unless a middleware reads its content
+    StreamingHttpResponse = HttpResponse
+
+"""
+Example:
+
+
+    class Export(ExportView):
+        model = Post
+        export_fields = ['id', 'title', 'date', 'tag__name']
+
+    /posts/export?format=ndjson&status=p&sort=newer_first
+"""
+
+class Echo(object):
+    "File-like object for csv.writer: write() returns the line instead of storing it."
+    def write(self, value):
+        return value
+
+
+class ListExportMixin(object):
+    """
+    Mixin for views that stream the whole object list, filtered and sorted
+    like the list view, in CSV or NDJSON.
+
+    The rows are read in chunks of chunk_size, seeking on the ordering like
+    CursorPaginator, so the memory used doesn't depend on the number of rows
+    (lists sorted randomly, by an extra select or by a nullable column are
+    read with a single iterator() query instead).
+
+    Only the export_fields (or else the display_fields) are exported, and the
+    resources only route the view when export_fields is set (see
+    Resource.is_view_enabled).
+    """
+    stages = ('filter', 'sort')
+    export_fields = None
+    enabled_by = 'export_fields'
+    export_formats = ('csv', 'ndjson')
+    format_param = 'format'
+    chunk_size = 1000
+
+    def get_export_fields(self, queryset):
+        fields = self.export_fields or getattr(self, 'display_fields', None)
+        if not fields:
+            raise ImproperlyConfigured('%s needs export_fields' % type(self).__name__)
+        return list(fields)
+
+    def get_export_queryset(self):
+        queryset = self.get_queryset()
+        context = {}
+        for name in self.stages:
+            queryset = getattr(self, '%s_stage' % name)(queryset, context)
+        return queryset
+
+    def iter_rows(self, queryset, fields):
+        "Yields the values of the fields of every object, in chunks."
+        try:
+            paginator = CursorPaginator(queryset, self.chunk_size)
+        except ImproperlyConfigured:
+            # The extra select columns must be selected to be ordered by
+            extra = [name for name in queryset.query.extra_select if name not in fields]
+            for row in queryset.values_list(*(fields + extra)).iterator():
+                yield row[:len(fields)]
+            return
+        keys = [field for field, descending in paginator.ordering]
+        queryset = queryset.order_by(*paginator.get_order_by()).values_list(*(fields + keys))
+        values = None
+        while True:
+            chunk = queryset
+            if values is not None:
+                chunk = chunk.filter(paginator.get_seek_filter(values))
+            rows = list(chunk[:self.chunk_size])
+            for row in rows:
+                yield row[:len(fields)]
+            if len(rows) < self.chunk_size:
+                break
+            values = rows[-1][len(fields):]
+
+    def iter_csv(self, queryset, fields):
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        for row in self.iter_rows(queryset, fields):
+            yield writer.writerow([unicode(value).encode('utf-8') if value is not None else '' for value in row])
+
+    def iter_ndjson(self, queryset, fields):
+        encoder = DjangoJSONEncoder(separators=(',', ':'))
+        for row in self.iter_rows(queryset, fields):
+            yield encoder.encode(SortedDict(zip(fields, row))) + '\n'
+
+    def get_export_format(self):
+        format = self.kwargs.get('format') or self.request.GET.get(self.format_param) or self.export_formats[0]
+        if format not in self.export_formats:
+            raise Http404(u'Invalid export format (%s)' % format)
+        return format
+
+    def get(self, request, *args, **kwargs):
+        format = self.get_export_format()
+        queryset = self.get_export_queryset()
+        fields = self.get_export_fields(queryset)
+        content_type = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}[format]
+        response = StreamingHttpResponse(getattr(self, 'iter_%s' % format)(queryset, fields),
+            content_type='%s; charset=utf-8' % content_type)
+        response['Content-Disposition'] = 'attachment; filename="%s.%s"' % (
+            queryset.model._meta.module_name, format)
+        return response
+
+
+class ExportView(ListExportMixin, ListSortedMixin, ListFilteredMixin, MultipleObjectMixin, View):
+    """
+    Streams the object list, see ListExportMixin
+    """
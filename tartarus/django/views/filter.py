@@ -1,7 +1,11 @@
 from django.views.generic import ListView
 from django_easyfilters import FilterSet
 from django_easyfilters.filters import FILTER_DISPLAY
-from tartarus.utils import capfirst
+from django.utils.functional import lazy
+from tartarus.collection import LazyList
+from tartarus.django.facets import FacetEngine
+from tartarus.django.querystring import get_querystring
+from tartarus.utils import capfirst, class_cached
 
 class ListFilteredMixin(object):
     """
@@ -9,40 +13,66 @@ class ListFilteredMixin(object):
     """
     # Replace the default django.core filter by FilterSet
     filter_class = None
+    filter_by = None
+    # Facet counts, see tartarus.django.facets
+    facet_engine_class = FacetEngine
+    facets_timeout = None
+    facets_without_counts = ()
 
     def get_filter(self, queryset, params=None):
         # Pass the request object to the filter to keep the parameters in the url querystring ("?filter=2&old_param=...")
         if params == None:
             params = self.request.GET
             
-        filter_class = self.filter_class
+        filter_class = self.get_filter_class()
+        if not filter_class:
+            return None
+            
+        return filter_class(queryset, params)
+
+    def get_filter_class(self):
+        if any(attr in self.__dict__ for attr in ('Filter', 'filter_class', 'filter_by')):
+            # Given to this instance, e.g. as_view(filter_by=...)
+            return self.build_filter_class(self)
+        return self.get_class_filter_class()
+
+    @classmethod
+    @class_cached
+    def get_class_filter_class(cls):
+        "Returns the filter class of the view class, built once (not on every request)."
+        return cls.build_filter_class(cls)
+
+    @staticmethod
+    def build_filter_class(source):
+        "Builds the filter class from the Filter, filter_class and filter_by of source (a view or its class)."
+        filter_class = source.filter_class
         filter_attributes = None
             
-        if hasattr(self, 'Filter'):
-            if isinstance(self.Filter, FilterSet):
-                filter_class = self.Filter
+        if hasattr(source, 'Filter'):
+            if issubclass(source.Filter, FilterSet):
+                filter_class = source.Filter
             else:
-                filter_attributes = dict((k,v) for k, v in self.Filter.__dict__.iteritems() if not k.startswith('__'))
+                filter_attributes = dict((k,v) for k, v in source.Filter.__dict__.iteritems() if not k.startswith('__'))
                 
         if not filter_attributes:
-            filter_attributes = getattr(self, 'filter_by')
+            filter_attributes = source.filter_by
         
         if filter_attributes and not filter_class:
-            filter_class = type('Filter', (self.filter_class or FilterSet,), filter_attributes)
-        elif not filter_class:
-            return None
-            
-        return filter_class(queryset, params)
+            filter_class = type('Filter', (source.filter_class or FilterSet,), filter_attributes)
+        return filter_class
+
+    def get_facet_engine(self, filter):
+        if self.facet_engine_class:
+            return self.facet_engine_class(filter, timeout=self.facets_timeout,
+                                           without_counts=self.facets_without_counts).install()
 
     def filter_queryset(self, filter, queryset):
-        filters = [self.get_filter_representation(filter, field) for field in filter.filters]
+        self.get_facet_engine(filter)
+        # The facets are only computed if the template uses them
+        filters = LazyList(lambda: [self.get_filter_representation(filter, field) for field in filter.filters])
         queryset=filter.apply_filters(queryset)
-        is_filtered = False
-        for filter in filters:
-            for choice in filter['choices']:
-                if choice['link_type'] == 'remove':
-                    is_filtered = True
-                    break
+        # A filter is applied if some of its choices were found in the querystring
+        is_filtered = any(field.chosen for field in filter.filters)
         return filters, queryset, is_filtered
 
     def get_filter_representation(self, filter, field):
@@ -51,35 +81,51 @@ class ListFilteredMixin(object):
         context = {}
         context['label'] = capfirst(field_obj.verbose_name)
         context['choices'] = [dict(label=c.label,
-                               url=u'?' + c.params.urlencode() \
+                               url=self.get_filter_url(field, c) \
                                    if c.link_type != FILTER_DISPLAY else None,
                                link_type=c.link_type,
                                count=c.count)
                           for c in choices]
         return context
 
-    def get_context_data(self, **kwargs):
+    def get_filter_url(self, field, choice):
         """
-        Get the context for this view.
+        Returns the url of a filter choice, lazily: it's only built if the
+        template renders it, and only the field parameter is encoded.
         """
-        context = {}
-        queryset = kwargs.pop('object_list')
+        key = field.query_param
+        values = choice.params.getlist(key)
+        querystring = get_querystring(self.request)
+        return lazy(lambda: u'?' + querystring.replace(key, values, remove=['page']), unicode)()
 
+    def filter_stage(self, queryset, context):
+        """
+        List pipeline stage (see tartarus.django.views.base.ListView): updates
+        the context and returns the filtered queryset.
+        """
         filter = self.get_filter(queryset)
-        if filter:
+        # Not "if filter": FilterSet.__nonzero__ computes every facet
+        if filter is not None:
             filters, queryset, is_filtered = self.filter_queryset(filter, queryset)
             context.update({
                 'filters': filters,
                 'is_filtered': is_filtered,
                 'has_filters': True,
-                'object_list': queryset
             })
         else:
             context.update({
                 'filters': None,
                 'has_filters': False,
-                'object_list': queryset
             })
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        """
+        Get the context for this view.
+        """
+        context = {}
+        queryset = self.filter_stage(kwargs.pop('object_list'), context)
+        context['object_list'] = queryset
         
         context.update(kwargs)
         context_object_name = self.get_context_object_name(queryset)
@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.utils import translation
+from django.utils.cache import has_vary_header
+from tartarus.django.cache import get_generation, make_key
+
+"""
+Example:
+
+
+    class Posts(ModelResource):
+        model = Post
+        # Every list and detail page is cached for 10 minutes...
+        cache_timeout = 600
+        # ...per page, sort and status filter (other parameters are ignored)
+        cache_vary_on = ['page', 'sort', 'status']
+
+        class Detail(ModelResource.Detail):
+            # The detail pages show the tag and the user
+            cache_models = [Post, Tag]
+            cache_vary_on_user = True
+
+Saving or deleting a Post (or a Tag) invalidates the cached pages.
+"""
+
+class PageCacheMixin(object):
+    """
+    Mixin for class-based views: caches the GET responses in the Django cache
+    backend, for cache_timeout seconds.
+
+    The key varies on the path, the querystring (only the cache_vary_on keys,
+    if given), the language, the user (if cache_vary_on_user) and the
+    generation counters of cache_models (by default, the model of the view),
+    so every page of a model is invalidated when one of its objects is saved
+    or deleted (see tartarus.django.cache).
+
+    Responses that set cookies, use the CSRF token, vary on the cookies,
+    read the session (e.g. request.user, unless cache_vary_on_user) or aren't
+    200 OK are not cached: they can't be served to other users. So the views
+    that check the user, like the staff-only ones, are never cached.
+    """
+    cache_timeout = None
+    cache_vary_on = None
+    cache_vary_on_user = False
+    cache_models = None
+
+    def get_cache_models(self):
+        if self.cache_models is not None:
+            return self.cache_models
+        model = getattr(self, 'model', None) or getattr(getattr(self, 'queryset', None), 'model', None)
+        return [model] if model is not None else []
+
+    def get_page_cache_key(self, request):
+        if self.cache_vary_on is None:
+            params = sorted(request.GET.lists())
+        else:
+            params = [(key, request.GET.getlist(key)) for key in sorted(self.cache_vary_on) if key in request.GET]
+        parts = [type(self).__module__, type(self).__name__, request.path, params, translation.get_language()]
+        if self.cache_vary_on_user:
+            user = getattr(request, 'user', None)
+            parts.append(user.pk if user is not None and user.is_authenticated() else None)
+        parts += [get_generation(model) for model in self.get_cache_models()]
+        return make_key('page', *parts)
+
+    def dispatch(self, request, *args, **kwargs):
+        dispatch = super(PageCacheMixin, self).dispatch
+        if self.cache_timeout is None or request.method not in ('GET', 'HEAD'):
+            return dispatch(request, *args, **kwargs)
+        key = self.get_page_cache_key(request)
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = dispatch(request, *args, **kwargs)
+        if response.status_code != 200 or request.method != 'GET':
+            return response
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+        # The CSRF token and the session are only used while rendering
+        if self.is_cacheable(request, response):
+            cache.set(key, response, self.cache_timeout)
+        return response
+
+    def is_cacheable(self, request, response):
+        "True if the response can be served to any request with the same key."
+        if response.cookies or request.META.get('CSRF_COOKIE_USED') or has_vary_header(response, 'Cookie'):
+            return False
+        session = getattr(request, 'session', None)
+        # The page may show the user (or other session data), unless the key varies on the user
+        return not (session is not None and session.accessed and not self.cache_vary_on_user)
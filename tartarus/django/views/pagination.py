@@ -1,3 +1,4 @@
+from django.core.exceptions import ImproperlyConfigured
 from django.views.generic import ListView
 from tartarus.django.pagination import Paginator
 
@@ -11,19 +12,22 @@ class ListPaginatedMixin(object):
     """
     # Replace the default django.core paginator by Paginator
     paginator_class = Paginator
+    # When paginator_class can't paginate the list (e.g. a CursorPaginator and a nullable ordering)
+    fallback_paginator_class = Paginator
 
     def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True):
         # Pass the request object to the paginator to keep the parameters in the url querystring ("?page=2&old_param=...")
         request = self.request
-        return self.paginator_class(queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page, request=request)
+        try:
+            return self.paginator_class(queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page, request=request)
+        except ImproperlyConfigured:
+            return self.fallback_paginator_class(queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page, request=request)
 
-    def get_context_data(self, **kwargs):
+    def paginate_stage(self, queryset, context):
         """
-        Get the context for this view.
+        List pipeline stage (see tartarus.django.views.base.ListView): updates
+        the context and returns the objects of the current page.
         """
-        context = {}
-        queryset = kwargs.pop('object_list')
-
         page_size = self.get_paginate_by(queryset)
         if page_size:
             paginator, page, queryset, is_paginated = self.paginate_queryset(queryset, page_size)
@@ -31,15 +35,22 @@ class ListPaginatedMixin(object):
                 'paginator': paginator,
                 'page_obj': page,
                 'is_paginated': is_paginated,
-                'object_list': queryset
             })
         else:
             context.update({
                 'paginator': None,
                 'page_obj': None,
                 'is_paginated': False,
-                'object_list': queryset
             })
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        """
+        Get the context for this view.
+        """
+        context = {}
+        queryset = self.paginate_stage(kwargs.pop('object_list'), context)
+        context['object_list'] = queryset
         
         context.update(kwargs)
         context_object_name = self.get_context_object_name(queryset)
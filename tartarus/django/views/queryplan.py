@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.db import connections
+from django.views.generic import DetailView
+from tartarus.django.queryplan import QueryPlan
+from tartarus.utils import class_cached
+
+"""
+Example:
+
+
+    class Detail(DetailView):
+        model = Post
+        display_fields = ['title', 'date', 'tag__name', 'comment_set__text']
+        # Fail (in DEBUG) if the page runs more than 3 queries
+        query_budget = 3
+
+In the template, {{ object|model_fields:display_fields }} renders those fields.
+"""
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+class QueryPlanMixin(object):
+    """
+    Mixin for generic class-based views with a queryset: loads the fields in
+    display_fields (see QueryPlan), and checks the query budget of the page.
+    """
+    display_fields = None
+    query_budget = None
+
+    @classmethod
+    @class_cached
+    def get_query_plan(cls):
+        model = cls.model or getattr(cls.queryset, 'model', None)
+        if model is None or not cls.display_fields:
+            return None
+        return QueryPlan(model, cls.display_fields)
+
+    def get_queryset(self):
+        queryset = super(QueryPlanMixin, self).get_queryset()
+        plan = self.get_query_plan()
+        if plan is not None:
+            queryset = plan.apply(queryset)
+        return queryset
+
+    def get_display_fields(self):
+        "The display fields, with the accessor names of the relations."
+        plan = self.get_query_plan()
+        return plan.paths if plan is not None else None
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault('display_fields', self.get_display_fields())
+        return super(QueryPlanMixin, self).get_context_data(**kwargs)
+
+    def count_queries(self):
+        return sum(len(connections[alias].queries) for alias in connections)
+
+    def dispatch(self, request, *args, **kwargs):
+        # The queries are only recorded in DEBUG
+        if self.query_budget is None or not settings.DEBUG:
+            return super(QueryPlanMixin, self).dispatch(request, *args, **kwargs)
+        start = self.count_queries()
+        response = super(QueryPlanMixin, self).dispatch(request, *args, **kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+        queries = self.count_queries() - start
+        if queries > self.query_budget:
+            raise QueryBudgetExceeded('%s ran %d queries, its budget is %d' % (
+                request.path, queries, self.query_budget))
+        return response
+
+
+class DetailView(QueryPlanMixin, DetailView):
+    pass
@@ -1,6 +1,11 @@
 from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import AutoField, IntegerField
 from django.views.generic import ListView
 from django_filters.filterset import FilterSet
+from tartarus.django.search import RESULTS_LIMIT
+from tartarus.utils import class_cached
+import inspect
 
 """
 Example:
@@ -12,6 +17,9 @@ class Posts(ModelResource):
         class Search:
             content = filters.CharFilter(lookup_type='contains')
             order_by = [ 'title', 'content' ]
+            # Full-text search on ?q=...
+            backend = get_backend()
+            backend_fields = [ 'title', 'content' ]
 
 
 # Template
@@ -25,12 +33,24 @@ class ListSearchMixin(object):
     """
 
     search_set = {}
+    # Querystring parameter with the full-text query (see tartarus.django.search)
+    search_param = 'q'
+    backend_attributes = ['backend', 'backend_fields']
+    # SQLite binds at most 999 parameters per query (99 are left for the filters)
+    sqlite_max_params = 999
     
+    @class_cached
     def get_search_set(self):
-        if not isinstance(self.search_set, FilterSet):
-            filter_dict = getattr(self, 'Search', self.search_set)
+        # Built once per view class, not on every request
+        search_set = self.search_set
+        if not (inspect.isclass(search_set) and issubclass(search_set, FilterSet)):
+            filter_dict = getattr(self, 'Search', search_set)
             if not isinstance(filter_dict, dict):
                 filter_dict = filter_dict.__dict__.copy()
+            else:
+                filter_dict = filter_dict.copy()
+            for attr in self.backend_attributes:
+                filter_dict.pop(attr, None)
             if 'model' not in filter_dict and self.model:
                 filter_dict['model']=self.model
             if 'model' in filter_dict:
@@ -40,10 +60,10 @@ class ListSearchMixin(object):
                         meta_dict[attr] = filter_dict[attr]
                         del filter_dict[attr]
                 filter_dict['Meta']=type('Meta', (object,), meta_dict)
-                self.search_set = type('%sFilterSet' % self.model._meta.object_name, (FilterSet,),
+                search_set = type('%sFilterSet' % meta_dict['model']._meta.object_name, (FilterSet,),
                     filter_dict)
-        if self.search_set:
-            return self.search_set
+        if search_set:
+            return search_set
         
         raise ImproperlyConfigured(
                 "ListFilterMixin requires either a definition of "
@@ -78,8 +98,67 @@ class ListSearchMixin(object):
             self.constructed_filter = f
             return f
 
+    @class_cached
+    def get_search_backend(self):
+        backend = getattr(getattr(self, 'Search', None), 'backend', None)
+        if backend:
+            backend.register(self.model, self.Search.backend_fields)
+        return backend
+
+    def has_integer_pk(self, model):
+        return isinstance(model._meta.pk, (AutoField, IntegerField))
+
+    def get_search_limit(self, queryset):
+        """
+        The maximum number of results. Integer primary keys are written in the
+        query, other ones are bound twice (filter and rank), so on SQLite they
+        are limited by the number of parameters.
+        """
+        if connections[queryset.db].vendor == 'sqlite' and not self.has_integer_pk(queryset.model):
+            return min(RESULTS_LIMIT, (self.sqlite_max_params - 99) // 2)
+        return RESULTS_LIMIT
+
+    def search_queryset(self, queryset, backend, query):
+        """
+        Restricts the queryset to the primary keys found by the backend, ranked
+        by relevance (the search_rank column).
+        """
+        pks = backend.search(queryset.model, query, limit=self.get_search_limit(queryset))
+        if not pks:
+            # Not none(): an EmptyQuerySet keeps the unfiltered query (and its cache keys)
+            return queryset.filter(pk__in=[])
+        qn = connections[queryset.db].ops.quote_name
+        opts = queryset.model._meta
+        column = '%s.%s' % (qn(opts.db_table), qn(opts.pk.column))
+        if self.has_integer_pk(queryset.model):
+            values = ['%d' % int(pk) for pk in pks]
+            where, params = ['%s IN (%s)' % (column, ', '.join(values))], []
+        else:
+            values = ['%s'] * len(pks)
+            queryset, params = queryset.filter(pk__in=pks), pks
+            where = []
+        rank = 'CASE %s %s END' % (column, ' '.join('WHEN %s THEN %d' % (value, i) for i, value in enumerate(values)))
+        return queryset.extra(select={'search_rank': rank}, select_params=params, where=where,
+            order_by=['search_rank'])
+
+    def sort_stage(self, queryset, context):
+        """
+        While searching, the relevance stays the first ordering: the sort
+        choice only orders the results with the same rank.
+        """
+        queryset = super(ListSearchMixin, self).sort_stage(queryset, context)
+        if 'search_rank' in queryset.query.extra_select:
+            order_by = [field for field in queryset.query.order_by if field != 'search_rank']
+            queryset = queryset.order_by('search_rank', *order_by)
+        return queryset
+
     def get_queryset(self):
-        return self.get_constructed_filter().qs
+        queryset = self.get_constructed_filter().qs
+        backend = self.get_search_backend()
+        query = self.request.GET.get(self.search_param)
+        if backend and query:
+            queryset = self.search_queryset(queryset, backend, query)
+        return queryset
 
     def get_context_data(self, **kwargs):
         kwargs.update({'filter': self.get_constructed_filter()})
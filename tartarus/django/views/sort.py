@@ -1,7 +1,8 @@
-from tartarus.django.sort import Sort, Choice, InvalidChoice
+from tartarus.django.sort import Sort, SortTable, Choice, InvalidChoice
 from django.views.generic import ListView
 from django.http import Http404
 from django.utils.translation import ugettext as _
+from tartarus.utils import class_cached
 
 """
 Example:
@@ -20,6 +21,8 @@ Example:
             newer_first = Choice('date', label='Date: New to old')
             older_first = Choice('-date', label='Date: Old to new')
             length = Choice('length', extra={'select':{'length':'Length(content)'}})
+            # Indexed alternative to the extra select, see Choice
+            shortest = Choice('content_length', precompute=lambda post: len(post.content))
         
 
 """
@@ -30,17 +33,54 @@ class ListSortedMixin(object):
     """
     sort_class = Sort
     default_order = None
+    order_by = None
     
-    def __init__(self, order_by=None):
+    def __init__(self, order_by=None, **kwargs):
+        super(ListSortedMixin, self).__init__(**kwargs)
         if order_by:
             self.order_by = order_by
-        elif hasattr(self, 'Sort'):
-            order_by = dict((k,v) for k, v in self.Sort.__dict__.iteritems() if isinstance(v, Choice))
-            self.order_by = order_by
+    
+    @classmethod
+    @class_cached
+    def get_class_sort_table(cls):
+        """
+        Returns the SortTable of the view class, compiled once from the Sort
+        inner class (or the order_by dict).
+        """
+        order_by = cls.order_by
+        if hasattr(cls, 'Sort'):
+            order_by = dict((k,v) for k, v in cls.Sort.__dict__.iteritems() if isinstance(v, Choice))
+        if order_by:
+            return SortTable(order_by)
+    
+    def get_sort_table(self):
+        if 'order_by' in self.__dict__:
+            # order_by given to this instance, e.g. as_view(order_by=...)
+            return SortTable(self.order_by) if self.order_by else None
+        return self.get_class_sort_table()
+    
+    @classmethod
+    @class_cached
+    def prepare_sort(cls):
+        """
+        Prepares the choices of the view for its model (see Choice.prepare).
+        Called at startup by the resources, or else on the first request.
+        """
+        model = cls.model or getattr(cls.queryset, 'model', None)
+        table = cls.get_class_sort_table()
+        if model is None or table is None:
+            return False
+        for choice in table:
+            choice.prepare(model)
+        return True
     
     def get_order_by(self, queryset):
+        table = self.get_sort_table()
+        if table is None:
+            return None
+        self.prepare_sort()
         request = self.request
-        return self.sort_class(queryset, self.order_by, request=request)
+        return self.sort_class(queryset, table, request=request)
     
     def sort_queryset(self, queryset, sort):
         sortchoice = self.kwargs.get('sort') or self.request.GET.get('sort') or self.default_order or sort.default
@@ -48,20 +88,18 @@ class ListSortedMixin(object):
             sort.object_list = queryset
             sort.sort_object_list(sortchoice)
             sortchoice_obj = sort.get_choice(sortchoice)
-            return (sort, sortchoice_obj, sort.object_list, bool(self.order_by))
+            return (sort, sortchoice_obj, sort.object_list, True)
         except InvalidChoice:
             raise Http404(_(u'Invalid ordering choice (%(sortchoice)s)') % {
                                 'sortchoice': sortchoice
             })
         
         
-    def get_context_data(self, **kwargs):
+    def sort_stage(self, queryset, context):
         """
-        Get the context for this view.
+        List pipeline stage (see tartarus.django.views.base.ListView): updates
+        the context and returns the sorted queryset.
         """
-        context = {}
-        queryset = kwargs.pop('object_list')
-        
         order_by = self.get_order_by(queryset)
         if order_by:
             sort, sortchoice, queryset, is_sorted = self.sort_queryset(queryset, order_by)
@@ -69,15 +107,22 @@ class ListSortedMixin(object):
                 'sort': sort,
                 'sortchoice_obj': sortchoice,
                 'is_sorted': is_sorted,
-                'object_list': queryset
             })
         else:
             context.update({
                 'sort': None,
                 'sortchoice_obj': None,
                 'is_sorted': False,
-                'object_list': queryset
             })
+        return queryset
+        
+    def get_context_data(self, **kwargs):
+        """
+        Get the context for this view.
+        """
+        context = {}
+        queryset = self.sort_stage(kwargs.pop('object_list'), context)
+        context['object_list'] = queryset
         
         context.update(kwargs)
         context_object_name = self.get_context_object_name(queryset)
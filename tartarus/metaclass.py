@@ -1,30 +1,150 @@
 """Extendable metaclass set with different funcionalities"""
+from tartarus.utils import get_leaf_subclasses
+import os
+import threading
+import weakref
+
+class Registry(object):
+    """The classes registered by a RegisteredMetaclass, in definition order.
+
+    Indexed by name ('Name' or 'module.Name', the last defined wins) and by
+    the values of the attributes listed in the metaclass 'indexes' (as
+    defined in the class body or inherited, when the class is created).
+    With weak=True, it only keeps weak references, so the classes are dropped
+    from the registry when they are garbage collected.
+    """
+
+    def __init__(self, indexes=(), weak=False):
+        self.indexes = tuple(indexes)
+        self.weak = weak
+        self._lock = threading.RLock()
+        self._refs = []
+        self._by_name = {}
+        self._by_attribute = dict((attr, {}) for attr in self.indexes)
+
+    def _get_names(self, cls):
+        return [cls.__name__, '%s.%s' % (cls.__module__, cls.__name__)]
+
+    def _get_index_values(self, cls):
+        for attr in self.indexes:
+            if hasattr(cls, attr):
+                value = getattr(cls, attr)
+                try:
+                    hash(value)
+                except TypeError:
+                    continue
+                yield attr, value
+
+    def register(self, cls):
+        if self.weak:
+            ref = weakref.ref(cls, self._remove)
+        else:
+            ref = lambda: cls
+        with self._lock:
+            self._refs.append(ref)
+            for name in self._get_names(cls):
+                self._by_name[name] = ref
+            for attr, value in self._get_index_values(cls):
+                self._by_attribute[attr].setdefault(value, []).append(ref)
+
+    def _remove(self, ref):
+        # Weak reference callback: the class is gone, forget its references
+        with self._lock:
+            self._refs = [r for r in self._refs if r is not ref]
+            for name, r in self._by_name.items():
+                if r is ref:
+                    del self._by_name[name]
+            for values in self._by_attribute.values():
+                for value, refs in values.items():
+                    refs = [r for r in refs if r is not ref]
+                    if refs:
+                        values[value] = refs
+                    else:
+                        del values[value]
+
+    def _resolve(self, refs):
+        return [cls for cls in (ref() for ref in refs) if cls is not None]
+
+    def lookup(self, name, default=None):
+        "Returns the class with the given name ('Name' or 'module.Name')."
+        ref = self._by_name.get(name)
+        cls = ref() if ref is not None else None
+        return default if cls is None else cls
+
+    def filter(self, **attributes):
+        """Returns the classes with the given attribute values.
+
+        Uses the indexes for the indexed attributes, and compares the other
+        ones.
+        """
+        with self._lock:
+            refs = self._refs
+            for attr, value in attributes.items():
+                if attr in self._by_attribute:
+                    try:
+                        indexed = set(self._by_attribute[attr].get(value, ()))
+                    except TypeError:
+                        continue
+                    refs = [ref for ref in refs if ref in indexed]
+            classes = self._resolve(refs)
+        return [cls for cls in classes
+            if all(getattr(cls, attr, Registry) == value for attr, value in attributes.items())]
+
+    def classes(self):
+        with self._lock:
+            return self._resolve(self._refs)
+
+    def __iter__(self):
+        return iter(self.classes())
+
+    def __len__(self):
+        return len(self.classes())
+
+    def __contains__(self, cls):
+        return self.lookup('%s.%s' % (cls.__module__, cls.__name__)) is cls
+
+    def __getitem__(self, index):
+        return self.classes()[index]
+
+    def __repr__(self):
+        return repr(self.classes())
+
+
 class RegisteredMetaclass(type):
     """Registers all the defined subclasses.
 
     The metaclass must be named as follows: '<baseclass>Metaclass', or its class must define a class attribute named 'baseclass' with the name of the base class.
 
+    The subclasses are kept in a Registry, indexed by the class attributes
+    listed in 'indexes'. Set 'weak' to True to keep weak references only.
+
     Usage:
 
     from tartarus.metaclass import RegisteredMetaclass
 
     class TestMetaclass(RegisteredMetaclass):
-        pass
+        indexes = ['kind']
 
     class Test(object):
         __metaclass__ = TestMetaclass
 
     class FirstTest(Test):
-        pass
+        kind = 'a'
 
     class SecondTest(Test):
-        pass
+        kind = 'b'
 
 
     print Test.registered
     Out: [<class '__main__.FirstTest'>, <class '__main__.SecondTest'>]
 
+    print Test.registered.lookup('SecondTest'), Test.registered.filter(kind='a')
+    Out: <class '__main__.SecondTest'> [<class '__main__.FirstTest'>]
+
     """
+    indexes = ()
+    weak = False
+    _lock = threading.RLock()
 
     def __new__(self, classname, bases, classDict):
         cls = type.__new__(self, classname, bases, classDict)
@@ -32,19 +152,118 @@ class RegisteredMetaclass(type):
             baseclass = self.baseclass
         else:
             baseclass = self.__name__[:-len('Metaclass')]
-        if classname == baseclass:
-            self.registered = []
-        else:
-            self.registered.append(cls)
+        with RegisteredMetaclass._lock:
+            if classname == baseclass:
+                self.registered = Registry(self.indexes, self.weak)
+            else:
+                self.registered.register(cls)
         return cls
 
 
 class Singleton(type):
+    """One instance per class and process (or per thread).
+
+    The instance is built once even if several threads ask for it at the same
+    time, and again in the child processes after a fork, so they don't share
+    the sockets or files of the instance of the parent.
+
+    Set 'singleton_scope' to 'thread' for an instance per thread.
+
+    Usage:
+
+    class Pool(object):
+        __metaclass__ = Singleton
+
+    Pool() is Pool()
+    Out: True
+
+    """
+    singleton_scope = 'process'
+    # Creates the lock of the instance of each class, after a fork too
+    _lock = threading.Lock()
+
     def __init__(cls, name, bases, dict):
         super(Singleton, cls).__init__(name, bases, dict)
         cls.instance = None 
+        cls._instance_pid = None
+        cls._instance_lock = None
+        cls._instance_lock_pid = None
+        cls._local = threading.local()
+        _singletons.add(cls)
+
+    def get_instance_lock(cls, pid):
+        if cls._instance_lock_pid != pid:
+            # New class, or forked: the lock could be held by a thread of the parent
+            with Singleton._lock:
+                if cls._instance_lock_pid != pid:
+                    cls._instance_lock = threading.Lock()
+                    cls._instance_lock_pid = pid
+        return cls._instance_lock
+
+    def reset(cls):
+        "Forgets the instance, the next call builds a new one."
+        cls.instance = None
+        cls._instance_pid = None
+        cls._local = threading.local()
 
     def __call__(cls,*args,**kw):
-        if cls.instance is None:
-            cls.instance = super(Singleton, cls).__call__(*args, **kw)
-        return cls.instance
\ No newline at end of file
+        pid = os.getpid()
+        if cls.singleton_scope == 'thread':
+            if getattr(cls._local, 'pid', None) != pid:
+                cls._local.instance = super(Singleton, cls).__call__(*args, **kw)
+                cls._local.pid = pid
+            return cls._local.instance
+        if cls.instance is None or cls._instance_pid != pid:
+            with cls.get_instance_lock(pid):
+                if cls.instance is None or cls._instance_pid != pid:
+                    cls.instance = super(Singleton, cls).__call__(*args, **kw)
+                    cls._instance_pid = pid
+        return cls.instance
+
+
+_singletons = weakref.WeakSet()
+
+def _reset_singletons_after_fork():
+    Singleton._lock = threading.Lock()
+    for cls in list(_singletons):
+        cls._instance_lock_pid = None
+        cls.reset()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_singletons_after_fork)
+
+
+class HierarchyMetaclass(type):
+    """Indexes the leaf subclasses of its classes.
+
+    The leaf subclasses (see tartarus.utils.get_leaf_subclasses) of a class are
+    computed once, and again only when one of its subclasses is defined.
+
+    Usage:
+
+    class Resource(object):
+        __metaclass__ = HierarchyMetaclass
+
+    Resource.get_leaf_subclasses()
+
+    """
+    _lock = threading.RLock()
+
+    def __init__(cls, classname, bases, classDict):
+        super(HierarchyMetaclass, cls).__init__(classname, bases, classDict)
+        cls._leaf_subclasses = {}
+        with HierarchyMetaclass._lock:
+            for base in cls.__mro__[1:]:
+                if isinstance(base, HierarchyMetaclass):
+                    base.__dict__['_leaf_subclasses'].clear()
+
+    def get_leaf_subclasses(cls, filter=None, attribute='is_usable'):
+        key = (filter, attribute)
+        leafs = cls.__dict__['_leaf_subclasses'].get(key)
+        if leafs is None:
+            with HierarchyMetaclass._lock:
+                leafs = cls.__dict__['_leaf_subclasses'].get(key)
+                if leafs is None:
+                    leafs = tuple(get_leaf_subclasses(cls, filter=filter, attribute=attribute))
+                    cls.__dict__['_leaf_subclasses'][key] = leafs
+        return list(leafs)
@@ -1,4 +1,6 @@
+import functools
 import inspect
+import threading
 
 
 def config(target, **kwargs):
@@ -7,6 +9,29 @@ def config(target, **kwargs):
     return target
 
 
+_class_cache_lock = threading.RLock()
+
+def class_cached(method):
+    """
+    Decorator for methods whose result only depends on the class (like the
+    classes built with type() from inner class declarations): it's computed
+    once per class, on first use, and stored on the class itself (not shared
+    with subclasses). Thread safe.
+    """
+    name = '_%s_cache' % method.__name__
+    @functools.wraps(method)
+    def wrapper(self):
+        cls = self if isinstance(self, type) else type(self)
+        try:
+            return cls.__dict__[name]
+        except KeyError:
+            with _class_cache_lock:
+                if name not in cls.__dict__:
+                    setattr(cls, name, method(self))
+                return cls.__dict__[name]
+    return wrapper
+
+
 def set_attributes_to_inner_classes(outer, attributes=None, parent=object):
     inner_classes = [member for name, member in inspect.getmembers(outer, inspect.isclass) if issubclass(member, parent)]
     if attributes is None:
@@ -18,11 +43,21 @@ def set_attributes_to_inner_classes(outer, attributes=None, parent=object):
                 
                 
 
-def get_leaf_subclasses(base, ignore=[], filter=None, attribute='is_usable'):
+def get_leaf_subclasses(base, ignore=None, filter=None, attribute='is_usable'):
+    """
+    Returns the leaf subclasses of base: the ones without subclasses, or whose
+    attribute (if defined) is true, and accepted by filter (if given).
+
+    Walks the whole hierarchy on every call, use
+    tartarus.metaclass.HierarchyMetaclass to index it.
+    """
+    if not isinstance(ignore, set):
+        # A list or tuple of classes can also be given
+        ignore = set(ignore or ())
     leafs=[]
     for c in base.__subclasses__():
         if c not in ignore:
-            ignore.append(c)
+            ignore.add(c)
             if c not in leafs:
                 is_leaf = True
                 if filter:
@@ -34,7 +69,7 @@ def get_leaf_subclasses(base, ignore=[], filter=None, attribute='is_usable'):
                 if is_leaf:
                     leafs.append(c)
                 else:
-                    leafs += get_leaf_subclasses(c, ignore)
+                    leafs += get_leaf_subclasses(c, ignore, filter, attribute)
     return leafs
             
             
@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+"""
+Runs the tests of tartarus.django, with the test project of this directory:
+
+    python tests/runtests.py [testapp.TestCase[.test_method] ...]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+
+from django.conf import settings
+from django.test.utils import get_runner
+
+
+def main():
+    TestRunner = get_runner(settings)
+    failures = TestRunner(verbosity=1, interactive=False, failfast=False).run_tests(sys.argv[1:] or ['testapp'])
+    sys.exit(bool(failures))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+PROJECT_NAME = 'tests.testapp'
+
+DEBUG = False
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+INSTALLED_APPS = (
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'tartarus.django.templatetags',
+    'tests.testapp',
+)
+MIDDLEWARE_CLASSES = (
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+)
+ROOT_URLCONF = 'tests.urls'
+TEMPLATE_DIRS = (
+    os.path.join(PROJECT_ROOT, 'templates'),
+)
+SECRET_KEY = 'tartarus-tests'
+SITE_ID = 1
+
+SEARCH_SETTINGS = {
+    'INDEX_PATH': os.path.join(tempfile.gettempdir(), 'tartarus-tests-search.db'),
+    'INDEXES': {'testapp.post': ['title']},
+}
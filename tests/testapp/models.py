@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=20)
+
+    class Meta:
+        # Not the order of the primary keys
+        ordering = ['-name']
+
+
+class Post(models.Model):
+    title = models.CharField(max_length=100)
+    date = models.DateTimeField()
+    status = models.CharField(max_length=1, choices=(('d', 'Draft'), ('p', 'Published')))
+    score = models.IntegerField(null=True)
+    tag = models.ForeignKey(Tag)
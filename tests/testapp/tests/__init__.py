@@ -0,0 +1,7 @@
+from tests.testapp.tests.pagination import *
+from tests.testapp.tests.filter import *
+from tests.testapp.tests.search import *
+from tests.testapp.tests.sort import *
+from tests.testapp.tests.resources import *
+from tests.testapp.tests.pagecache import *
+from tests.testapp.tests.bulk import *
@@ -0,0 +1,15 @@
+from tests.testapp.models import Post, Tag
+import datetime
+
+
+def create_posts(count=40):
+    "Creates count posts, spread over tags whose names aren't in primary key order."
+    tags = [Tag.objects.create(name=name) for name in ['m', 'c', 'x', 'a', 'q']]
+    start = datetime.datetime(2012, 1, 1)
+    return [Post.objects.create(
+        title='post %02d' % (i % 13),
+        date=start + datetime.timedelta(days=i % 7),
+        status='dp'[i % 2],
+        score=i % 5 if i % 3 else None,
+        tag=tags[i % len(tags)],
+    ) for i in range(count)]
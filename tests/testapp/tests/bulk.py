@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from tests.testapp.models import Post, Tag
+from tests.testapp.tests.base import create_posts
+
+
+class BulkTest(TestCase):
+    def setUp(self):
+        create_posts()
+        user = User.objects.create_user('alice', 'alice@example.com', 'secret')
+        user.is_staff = True
+        user.save()
+        User.objects.create_user('bob', 'bob@example.com', 'secret')
+
+    def test_permission(self):
+        self.assertEqual(self.client.post('/posts/bulk-delete', {'pk': ['1', '2']}).status_code, 403)
+        self.client.login(username='bob', password='secret')
+        self.assertEqual(self.client.post('/posts/bulk-delete', {'all': '1'}).status_code, 403)
+        self.assertEqual(Post.objects.count(), 40)
+
+    def test_delete_own_model(self):
+        # Tags is registered after Posts: its settings must not leak into Posts' views
+        self.client.login(username='alice', password='secret')
+        tags = Tag.objects.count()
+        response = self.client.post('/posts/bulk-delete', {'pk': ['1', '2']})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Tag.objects.count(), tags)
+        self.assertEqual(Post.objects.count(), 38)
+        self.assertFalse(Post.objects.filter(pk__in=[1, 2]).exists())
+
+    def test_update_own_model(self):
+        self.client.login(username='alice', password='secret')
+        response = self.client.post('/posts/bulk-update?status=d', {'all': '1', 'status': 'p'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.content, '{"count":20}')
+        self.assertEqual(Post.objects.filter(status='p').count(), 40)
+
+    def test_empty_selection(self):
+        self.client.login(username='alice', password='secret')
+        response = self.client.post('/tags/bulk-delete', HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.content, '{"count":0}')
+        self.assertEqual(self.client.get('/tags/bulk-delete?progress=unknown').status_code, 404)
+        self.assertEqual(Post.objects.count(), 40)
@@ -0,0 +1,25 @@
+from django.test import TestCase
+from django.views.generic import ListView
+from tartarus.django.views.filter import ListFilteredMixin
+from tests.testapp.models import Post
+
+
+class PostList(ListFilteredMixin, ListView):
+    model = Post
+    filter_by = {'fields': ['status']}
+
+
+class FilterClassTest(TestCase):
+    def test_class_filter(self):
+        self.assertEqual(PostList().get_filter_class().fields, ['status'])
+        # Built once per class
+        self.assertTrue(PostList().get_filter_class() is PostList().get_filter_class())
+
+    def test_instance_filter(self):
+        self.assertEqual(PostList(filter_by={'fields': ['tag']}).get_filter_class().fields, ['tag'])
+
+        class Filter:
+            fields = ['score']
+        self.assertEqual(PostList(Filter=Filter).get_filter_class().fields, ['score'])
+        # The class filter is unchanged
+        self.assertEqual(PostList().get_filter_class().fields, ['status'])
@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.client import Client
+from tests.testapp.tests.base import create_posts
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        create_posts(12)
+        user = User.objects.create_user('alice', 'alice@example.com', 'secret')
+        user.is_staff = True
+        user.save()
+
+    def test_cached(self):
+        self.client.get('/tags/')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/tags/').status_code, 200)
+
+    def test_user_pages(self):
+        # The posts template shows the user
+        self.client.login(username='alice', password='secret')
+        self.assertTrue('alice' in self.client.get('/posts/').content)
+        self.assertFalse('alice' in Client().get('/posts/').content)
+
+    def test_staff_views(self):
+        self.client.login(username='alice', password='secret')
+        self.assertEqual(self.client.get('/posts/bulk-update').status_code, 200)
+        self.assertEqual(Client().get('/posts/bulk-update').status_code, 403)
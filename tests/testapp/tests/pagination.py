@@ -0,0 +1,86 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.test.client import RequestFactory
+from tartarus.django.pagination import CursorPaginator, InvalidCursor, Paginator
+from tartarus.django.views.export import ListExportMixin
+from tartarus.django.views.pagination import ListPaginatedMixin
+from tests.testapp.models import Post
+from tests.testapp.tests.base import create_posts
+import base64
+import json
+
+
+class CursorPaginatorTest(TestCase):
+    def setUp(self):
+        create_posts()
+        self.factory = RequestFactory()
+
+    def get_page(self, queryset, cursor=None, per_page=6):
+        request = self.factory.get('/', {'cursor': cursor} if cursor else {})
+        return CursorPaginator(queryset, per_page, request=request).page()
+
+    def walk(self, queryset, backward=False):
+        "Returns the primary keys of every page, following the next (or previous) cursors."
+        pks = []
+        page = self.get_page(queryset)
+        if backward:
+            while page.has_next():
+                page = self.get_page(queryset, page.next_cursor())
+        while True:
+            rows = [post.pk for post in page.object_list]
+            pks = rows + pks if backward else pks + rows
+            cursor = page.previous_cursor() if backward else page.next_cursor()
+            if cursor is None:
+                return pks
+            page = self.get_page(queryset, cursor)
+
+    def test_walk(self):
+        for ordering in (['-date'], ['title'], ['tag'], ['-tag'], ['tag__name', '-date'], ['tag__id']):
+            queryset = Post.objects.order_by(*ordering)
+            paginator = CursorPaginator(queryset, 6)
+            expected = list(queryset.order_by(*paginator.get_order_by()).values_list('pk', flat=True))
+            self.assertEqual(len(expected), Post.objects.count())
+            self.assertEqual(self.walk(queryset), expected, ordering)
+            self.assertEqual(self.walk(queryset, backward=True), expected, ordering)
+
+    def test_relation_ordering(self):
+        # Seeked and ordered on the key column, not on the ordering of Tag
+        paginator = CursorPaginator(Post.objects.order_by('-tag'), 6)
+        self.assertEqual(paginator.ordering, [('tag__id', True), ('pk', False)])
+        post = Post.objects.get(pk=1)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.get_value(post, 'tag__id'), post.tag_id)
+
+    def test_nullable_ordering(self):
+        self.assertRaises(ImproperlyConfigured, CursorPaginator, Post.objects.order_by('score'), 6)
+        self.assertRaises(ImproperlyConfigured, CursorPaginator, Post.objects.order_by('?'), 6)
+
+    def test_tampered_cursors(self):
+        queryset = Post.objects.order_by('-date')
+        encode = lambda data: base64.urlsafe_b64encode(json.dumps(data)).rstrip('=')
+        for cursor in ['!!', encode([1]), encode({'d': 'x', 'v': ['2012-01-01T00:00:00', 1]}),
+                encode({'d': 'n', 'v': ['2012-01-01T00:00:00']}),
+                encode({'d': 'n', 'v': ['not a date', 1]}),
+                encode({'d': 'n', 'v': [None, 1]}),
+                encode({'d': 'n', 'v': [['2012-01-01'], 1]}),
+                encode({'d': 'n', 'v': ['2012-01-01T00:00:00', 'x']})]:
+            self.assertRaises(InvalidCursor, self.get_page, queryset, cursor)
+        page = self.get_page(queryset, encode({'d': 'n', 'v': ['2012-01-03T00:00:00', 1]}))
+        self.assertTrue(page.object_list)
+
+    def test_export_rows(self):
+        export = ListExportMixin()
+        export.chunk_size = 7
+        for ordering in (['tag'], ['score']):
+            queryset = Post.objects.order_by(*ordering)
+            rows = list(export.iter_rows(queryset, ['id']))
+            self.assertEqual(sorted(pk for pk, in rows), sorted(Post.objects.values_list('pk', flat=True)))
+
+    def test_list_fallback(self):
+        view = ListPaginatedMixin()
+        view.paginator_class = CursorPaginator
+        view.request = self.factory.get('/')
+        self.assertTrue(isinstance(view.get_paginator(Post.objects.order_by('title'), 6), CursorPaginator))
+        paginator = view.get_paginator(Post.objects.order_by('score'), 6)
+        self.assertFalse(isinstance(paginator, CursorPaginator))
+        self.assertTrue(isinstance(paginator, Paginator))
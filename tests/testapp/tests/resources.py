@@ -0,0 +1,94 @@
+from django.test import TestCase
+from django.test.client import RequestFactory
+from tartarus.django import resources
+from tests.testapp.models import Post, Tag
+from tests.testapp.tests.base import create_posts
+from tests.testapp.views import Posts, Tags
+import json
+import os
+import tempfile
+
+
+def get_url_names(patterns):
+    return sorted(pattern.name for resolver in patterns for pattern in resolver.url_patterns)
+
+
+class ManifestTest(TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        os.remove(self.path)
+        self.manifest_path = resources.MANIFEST_PATH
+        resources.MANIFEST_PATH = self.path
+
+    def tearDown(self):
+        resources.MANIFEST_PATH = self.manifest_path
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_reload(self):
+        for lazy in (False, True):
+            patterns = resources.discover_patterns(root=False, lazy=lazy)
+            self.assertTrue(os.path.exists(self.path))
+            loaded = resources.load_manifest(self.path, False, lazy)
+            self.assertEqual(get_url_names(loaded), get_url_names(patterns))
+            self.assertTrue('tags#index' in get_url_names(loaded))
+            os.remove(self.path)
+
+
+class ResourceIsolationTest(TestCase):
+    "Every resource configures its own subclass of the ModelResource views."
+    def setUp(self):
+        create_posts()
+
+    def get_csv(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return ''.join(response).splitlines()
+
+    def test_views(self):
+        posts, tags = Posts(), Tags()
+        self.assertTrue(posts.Export is not tags.Export)
+        self.assertTrue(issubclass(posts.Export, resources.ModelResource.Export))
+        self.assertEqual((posts.Export.model, tags.Export.model), (Post, Tag))
+        # The shared views aren't configured
+        self.assertFalse(hasattr(resources.ModelResource.Export, 'resource'))
+        self.assertEqual(resources.ModelResource.Export.export_fields, None)
+
+    def test_export(self):
+        rows = self.get_csv('/posts/export?status=p')
+        self.assertEqual(rows[0], 'id,title,status')
+        self.assertEqual(len(rows) - 1, Post.objects.filter(status='p').count())
+        rows = self.get_csv('/tags/export')
+        self.assertEqual(rows[0], 'id,name')
+        self.assertEqual(len(rows) - 1, Tag.objects.count())
+
+    def test_lazy_export(self):
+        for resource_class, model in ((Posts, Post), (Tags, Tag)):
+            lazy = resources.LazyResource(resource_class)
+            response = lazy.get_view(resource_class.Export)(RequestFactory().get('/export'))
+            self.assertEqual(len(''.join(response).splitlines()) - 1, model.objects.count())
+
+    def get_json(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return json.loads(response.content)
+
+    def walk_json(self, path):
+        objects = []
+        while path:
+            data = self.get_json(path)
+            objects += data['objects']
+            path = data['next']
+        return objects
+
+    def test_json(self):
+        posts = self.walk_json('/posts/list.json?fields=id,title&sort=by_tag')
+        self.assertEqual(sorted(post['id'] for post in posts), sorted(Post.objects.values_list('pk', flat=True)))
+        self.assertEqual(sorted(posts[0]), ['id', 'title'])
+        tags = self.walk_json('/tags/list.json?fields=name')
+        self.assertEqual(sorted(tag['name'] for tag in tags), sorted(Tag.objects.values_list('name', flat=True)))
+        post = Post.objects.get(pk=2)
+        self.assertEqual(self.get_json('/posts/2.json'), {'id': 2, 'title': post.title, 'tag': post.tag_id})
+        tag = Tag.objects.get(pk=2)
+        self.assertEqual(self.get_json('/tags/2.json'), {'id': 2, 'name': tag.name})
@@ -0,0 +1,23 @@
+from django.test import TestCase
+from tartarus.django.search import get_backend
+from tests.testapp.models import Post
+from tests.testapp.tests.base import create_posts
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        create_posts(10)
+        self.backend = get_backend()
+        self.backend.rebuild(Post)
+
+    def test_registered_at_app_load(self):
+        # No view searched in this process
+        self.assertEqual(self.backend.fields[Post], ['title'])
+
+    def test_index_updated(self):
+        post = Post.objects.get(pk=3)
+        post.title = 'renamed'
+        post.save()
+        self.assertEqual(self.backend.search(Post, 'renamed'), [post.pk])
+        post.delete()
+        self.assertEqual(self.backend.search(Post, 'renamed'), [])
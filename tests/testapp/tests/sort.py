@@ -0,0 +1,23 @@
+from django.test import TestCase
+from django.views.generic import ListView
+from tartarus.django.sort import Choice, UnindexedSortWarning
+from tartarus.django.views.sort import ListSortedMixin
+from tests.testapp.models import Post
+import warnings
+
+
+class Sort:
+    # title has no index
+    unindexed_title = Choice('title')
+
+
+class PrepareSortTest(TestCase):
+    def test_warned_once(self):
+        views = [type('PostList%s' % i, (ListSortedMixin, ListView), {'model': Post, 'Sort': Sort}) for i in range(3)]
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            for view in views:
+                view.prepare_sort()
+        caught = [warning for warning in caught if issubclass(warning.category, UnindexedSortWarning)]
+        self.assertEqual(len(caught), 1)
+        self.assertTrue('unindexed_title' in str(caught[0].message))
@@ -0,0 +1,37 @@
+from __future__ import absolute_import
+from tartarus.django.resources import ModelResource
+from tartarus.django.sort import Choice
+from tests.testapp.models import Post, Tag
+
+
+class Posts(ModelResource):
+    model = Post
+    export_fields = ['id', 'title', 'status']
+    api_fields = ['id', 'title', 'tag']
+    update_fields = ['status']
+    bulk_delete = True
+    cache_timeout = 60
+
+    class List(ModelResource.List):
+        paginate_by = 10
+
+        class Sort:
+            newer_first = Choice('-date', indexed=True)
+            by_tag = Choice('tag', indexed=True)
+
+        class Filter:
+            fields = ['status']
+
+
+class TagIndex(ModelResource.List):
+    paginate_by = 10
+
+
+class Tags(ModelResource):
+    model = Tag
+    export_fields = ['id', 'name']
+    api_fields = ['id', 'name']
+    bulk_delete = True
+    cache_timeout = 60
+    # Bound to another attribute than its class name
+    Index = TagIndex
@@ -0,0 +1,3 @@
+from tartarus.django import resources
+
+urlpatterns = resources.autodiscover(root=False)